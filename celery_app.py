@@ -25,6 +25,10 @@ app.conf.beat_schedule = {
         'task': 'notifications.tasks.cleanup_old_notifications',
         'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
     },
+    'relay-notification-outbox': {
+        'task': 'notifications.tasks.relay_notification_outbox',
+        'schedule': crontab(minute='*'),  # Events whose queued relay was lost
+    },
     'cleanup-inactive-connections': {
         'task': 'notifications.tasks.cleanup_inactive_websocket_connections',
         'schedule': crontab(minute='*/30'),  # Every 30 minutes
@@ -0,0 +1,194 @@
+from functools import partial
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+from simple_history import utils
+from simple_history.models import HistoricalRecords
+from simple_history.signals import post_create_historical_record, pre_create_historical_record
+
+
+class BufferedHistoricalRecords(HistoricalRecords):
+    """
+    HistoricalRecords whose rows are collected per transaction and written with one bulk_create
+    per history model once it commits - or handed to a celery worker - instead of one INSERT per save.
+    Controlled by settings.HISTORY_WRITE_MODE: 'immediate' | 'on_commit' | 'celery'.
+
+    Models opt out of history entirely with `track_history = False` and skip saves touching only
+    the fields in `history_ignored_update_fields` (e.g. last_login on every login).
+    """
+
+    def finalize(self, sender, **kwargs):
+        if self.cls is not sender and not getattr(sender, 'track_history', True):
+            return
+        super().finalize(sender, **kwargs)
+
+    def post_save(self, instance, created, using=None, update_fields=None, **kwargs):
+        ignored = getattr(instance, 'history_ignored_update_fields', ())
+        if update_fields and ignored and set(update_fields) <= set(ignored):
+            return
+        super().post_save(instance, created, using=using, **kwargs)
+
+    def create_historical_record(self, instance, history_type, using=None):
+        if settings.HISTORY_WRITE_MODE == 'immediate':
+            return super().create_historical_record(instance, history_type, using=using)
+
+        using = using if self.use_base_model_db else None
+        history_instance = self.build_historical_record(instance, history_type, using)
+        history_buffer.add(history_instance, instance, using or router.db_for_write(history_instance.__class__))
+
+    def build_historical_record(self, instance, history_type, using=None):
+        """Unsaved history row of the instance's current state, what the parent class would INSERT"""
+        history_date = getattr(instance, '_history_date', None) or timezone.now()
+        history_user = self.get_history_user(instance)
+        history_change_reason = self.get_change_reason_for_object(instance, history_type, using)
+        manager = getattr(instance, self.manager_name)
+
+        attrs = {field.attname: getattr(instance, field.attname) for field in self.fields_included(instance)}
+        if getattr(manager.model, 'history_relation', None) is not None:
+            attrs['history_relation'] = instance
+
+        history_instance = manager.model(
+            history_date=history_date,
+            history_type=history_type,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            **attrs,
+        )
+        # tracked m2m fields are snapshotted now, their rows are inserted with the history row
+        history_instance._pending_m2m_rows = [
+            row for field in history_instance._history_m2m_fields
+            for row in self.build_historical_m2m_rows(history_instance, instance, field)
+        ]
+        pre_create_historical_record.send(
+            sender=manager.model,
+            instance=instance,
+            history_date=history_date,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            history_instance=history_instance,
+            using=using,
+        )
+        return history_instance
+
+    def build_historical_m2m_rows(self, history_instance, instance, field):
+        """Unsaved snapshot of the instance's current m2m links, as create_historical_record_m2ms would INSERT"""
+        through_model = field.remote_field.through
+        rows = through_model.objects.filter(**{utils.get_m2m_field_name(field): instance}).values(
+            *[f.attname for f in through_model._meta.fields]
+        )
+        return [self.m2m_models[field](history=history_instance, **row) for row in rows]
+
+
+class HistoryBuffer:
+    """
+    Pending history rows per database and savepoint level.
+    A flush is registered with transaction.on_commit for every level rows are added at, so rows recorded
+    inside a savepoint that rolls back are dropped along with its callback. In autocommit the flush runs at once.
+    Savepoint rows are inserted by their own flush, so history_id is not the event order - history_date is.
+    """
+
+    def add(self, history_instance, instance, using):
+        connection = connections[using]
+        if not connection.in_atomic_block:
+            self.flush([(history_instance, instance)], using)
+            return
+
+        buffers = connection.__dict__.setdefault('_history_buffers', {})
+        key = tuple(connection.savepoint_ids)
+        if key not in buffers or not self._is_pending(connection, buffers[key][1]):
+            # forget the buffers of rolled back savepoints before starting a new one
+            for stale in [k for k, (_, flush) in buffers.items() if not self._is_pending(connection, flush)]:
+                del buffers[stale]
+            rows = []
+            flush = partial(self._flush_pending, buffers, key, rows, using)
+            buffers[key] = (rows, flush)
+            transaction.on_commit(flush, using=using)
+        buffers[key][0].append((history_instance, instance))
+
+    @staticmethod
+    def _is_pending(connection, flush):
+        return any(callback is flush for _, callback, _ in connection.run_on_commit)
+
+    def _flush_pending(self, buffers, key, rows, using):
+        buffers.pop(key, None)
+        self.flush(rows, using)
+
+    def flush(self, rows, using):
+        if not rows:
+            return
+        by_model = {}
+        for history_instance, instance in rows:
+            by_model.setdefault(history_instance.__class__, []).append((history_instance, instance))
+        rows.clear()
+
+        if settings.HISTORY_WRITE_MODE == 'celery':
+            for model, items in list(by_model.items()):
+                if model._history_m2m_fields:
+                    continue  # m2m snapshots hang off the history row pks, written here
+                write_history_rows.delay(model._meta.label, [
+                    {field.attname: field.value_from_object(history_instance) for field in model._meta.concrete_fields}
+                    for history_instance, _ in items
+                ], using)
+                del by_model[model]
+
+        for model, items in by_model.items():
+            model.objects.using(using).bulk_create([history_instance for history_instance, _ in items])
+
+            m2m_rows = {}
+            for history_instance, _ in items:
+                for row in history_instance._pending_m2m_rows:
+                    row.history_id = history_instance.pk
+                    m2m_rows.setdefault(row.__class__, []).append(row)
+            for m2m_model, rows in m2m_rows.items():
+                m2m_model.objects.using(using).bulk_create(rows)
+
+            for history_instance, instance in items:
+                post_create_historical_record.send(
+                    sender=model,
+                    instance=instance,
+                    history_instance=history_instance,
+                    history_date=history_instance.history_date,
+                    history_user=history_instance.history_user,
+                    history_change_reason=history_instance.history_change_reason,
+                    using=using,
+                )
+
+
+history_buffer = HistoryBuffer()
+
+
+def bulk_history_m2m_snapshot(model, instances, history_date, using='default'):
+    """
+    Tracked m2m snapshots for the history rows simple_history's bulk_create_with_history /
+    bulk_update_with_history wrote with `default_date=history_date` - they leave them out.
+    Call it once the instances' m2m links are written, costs one query per tracked field plus one.
+    """
+    history_model = model.history.model
+    if not history_model._history_m2m_fields:
+        return
+    pk_name = model._meta.pk.attname
+    history_ids = dict(history_model.objects.using(using).filter(
+        **{f'{pk_name}__in': [instance.pk for instance in instances]}, history_date=history_date
+    ).values_list(pk_name, 'history_id'))
+
+    for field in history_model._history_m2m_fields:
+        through_model = field.remote_field.through
+        m2m_model = getattr(history_model, field.name).model
+        owner = utils.get_m2m_field_name(field)
+        rows = through_model.objects.using(using).filter(**{f'{owner}__in': list(history_ids)}).values(
+            *[f.attname for f in through_model._meta.fields]
+        )
+        m2m_model.objects.using(using).bulk_create([
+            m2m_model(history_id=history_ids[row[f'{owner}_id']], **row) for row in rows
+        ])
+
+
+@shared_task
+def write_history_rows(model_label, rows, using='default'):
+    """Background side of HISTORY_WRITE_MODE = 'celery', rows are field attname -> value dicts"""
+    model = apps.get_model(model_label)
+    model.objects.using(using).bulk_create([model(**row) for row in rows])
+    return len(rows)
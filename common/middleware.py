@@ -1,19 +1,65 @@
 from __future__ import unicode_literals
-import threading
+import time
+from contextvars import ContextVar
 
-_user = threading.local()
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+
+# a context variable, not a threading.local - asgiref carries it across sync_to_async / async_to_sync hops
+# and concurrent requests served by one event loop each see their own value
+_user = ContextVar('current_user', default=None)
 
 class CurrentUserMiddleware:
-    """Middleware to store the current user in thread-local storage."""
+    """Middleware to store the current user in a context variable, sync and async."""
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        _user.value = request.user if request.user.is_authenticated else None
-        response = self.get_response(request)
-        return response
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _user.set(request.user if request.user.is_authenticated else None)
+        try:
+            return self.get_response(request)
+        finally:
+            # don't leak the user into whatever runs next on this thread
+            _user.reset(token)
+
+    async def __acall__(self, request):
+        user = await request.auser()
+        # resolved now - async views must not trigger the lazy sync lookup
+        request.user = user
+        token = _user.set(user if user.is_authenticated else None)
+        try:
+            return await self.get_response(request)
+        finally:
+            _user.reset(token)
 
 def get_current_user():
     """Utility function to access the current user."""
-    return getattr(_user, 'value', None)
\ No newline at end of file
+    return _user.get()
+
+
+class SlidingSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware with coalesced sliding expiry.
+    SESSION_SAVE_EVERY_REQUEST writes the session on every request only to push its expiry out - here an
+    unmodified session is saved (expiry and cookie renewed) once SESSION_REFRESH_FRACTION of its age has
+    passed since the last save. An active session still never expires, at most that fraction earlier.
+    """
+    refresh_key = '_session_refreshed_at'
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        # only sessions this request loaded anyway, checking must not load one
+        if session is not None and session.accessed and not session.is_empty():
+            now = int(time.time())
+            interval = session.get_expiry_age() * settings.SESSION_REFRESH_FRACTION
+            if session.modified or now - session.get(self.refresh_key, 0) >= interval:
+                session[self.refresh_key] = now
+        return super().process_response(request, response)
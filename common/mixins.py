@@ -0,0 +1,82 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from common.resolvers import aget_user_organization_ids
+from common.versions import aget_organization_versions, aget_versioned_cache_key
+
+
+class ConditionalListMixin:
+    """
+    ETag / Last-Modified validators for list endpoints, derived from max(updated_at) and the
+    row count of the scoped queryset - one aggregate query, nothing serialized - plus the
+    organization versions, which move when members change (nested in the payloads, no updated_at).
+    Clients re-polling with If-None-Match get a 304 before any serializer runs.
+    """
+
+    async def aget_list_validators(self, queryset):
+        state = await queryset.order_by().aaggregate(last_modified=Max('updated_at'), count=Count('id'))
+        return self._make_validators(state, await aget_organization_versions(await aget_user_organization_ids(self.request)))
+
+    def _make_validators(self, state, versions):
+        last_modified = state['last_modified']
+        # same rows, scope, organization versions (member changes) and query string -> same payload
+        fingerprint = '|'.join([
+            str(state['count']),
+            last_modified.isoformat() if last_modified else '',
+            ','.join(f'{pk}:{version}' for pk, version in sorted(versions.items())),
+            self.request.get_full_path(),
+        ])
+        etag = '"%s"' % hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()
+        return etag, last_modified
+
+    async def aget_not_modified_response(self, queryset):
+        """
+        304 response when the client's ETag still matches, else None (validators kept for the response).
+        Only the ETag decides - a delete lowers the count but leaves max(updated_at) where it was,
+        so Last-Modified is sent for information and If-Modified-Since alone never yields a 304.
+        """
+        return self._conditional_response(*await self.aget_list_validators(queryset))
+
+    def _conditional_response(self, etag, last_modified):
+        self.list_etag = etag
+        self.list_last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(getattr(self.request, '_request', self.request), etag=self.list_etag)
+        return self.set_validator_headers(response) if response is not None else None
+
+    def set_validator_headers(self, response):
+        response['ETag'] = self.list_etag
+        if self.list_last_modified is not None:
+            response['Last-Modified'] = http_date(self.list_last_modified)
+        # always revalidate, the validators make that cheap
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class VersionedCacheListMixin:
+    """
+    Caches the serialized list output per organization scope, organization versions and URL.
+    Writes to projects / tasks / organization members bump the organization version (core.signals),
+    so a changed list is simply looked up under a new key - nothing is scanned or deleted.
+    """
+    list_cache_prefix = None
+
+    def get_list_cache_prefix(self):
+        return self.list_cache_prefix or f'list_{self.__class__.__name__.lower()}'
+
+    async def aget_cached_list_data(self, build):
+        """Serialized data from the cache, else await build() and cache it"""
+        key = await aget_versioned_cache_key(
+            self.get_list_cache_prefix(),
+            await aget_user_organization_ids(self.request),
+            self.request.build_absolute_uri(),
+        )
+        data = await cache.aget(key)
+        if data is None:
+            data = await build()
+            await cache.aset(key, data, timeout=settings.LIST_RESPONSE_CACHE_TIMEOUT)
+        return data
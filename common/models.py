@@ -1,6 +1,6 @@
 from django.db import models
 from django.conf import settings
-from simple_history.models import HistoricalRecords
+from common.history import BufferedHistoricalRecords
 from common.middleware import get_current_user
 
 
@@ -26,7 +26,8 @@ class BaseModels(models.Model):
         verbose_name='Updated by'
     )
 
-    history = HistoricalRecords(inherit=True)
+    # rows written in bulk after commit (settings.HISTORY_WRITE_MODE), opt out with `track_history = False`
+    history = BufferedHistoricalRecords(inherit=True)
 
     class Meta:
         abstract = True
@@ -0,0 +1,168 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, LimitOffsetPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id).
+    The cursor carries the position of the last row seen, so every page is a
+    `WHERE (created_at, id) < (...) ORDER BY created_at DESC, id DESC LIMIT n`
+    range scan on the matching index - page N costs the same as page 1.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    position_separator = '|'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._get_page_queryset(queryset, request, view)
+        return queryset if queryset is None else self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() reading the page through the async ORM"""
+        queryset = self._get_page_queryset(queryset, request, view)
+        return queryset if queryset is None else self._set_page([row async for row in queryset])
+
+    def _get_page_queryset(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.reverse, self.current_position = False, None
+        else:
+            self.reverse, self.current_position = self.cursor.reverse, self.cursor.position
+
+        if self.reverse:
+            queryset = queryset.order_by(*[self._flip(order) for order in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # (created_at, id) is unique, so the position alone marks where the page starts - no offsets
+        if self.current_position is not None:
+            queryset = queryset.filter(self._position_filter(self.current_position, self.reverse, queryset.model))
+
+        # Fetch one extra row to know whether a following page exists
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        reverse, current_position = self.reverse, self.current_position
+        self.page = results[:self.page_size]
+
+        has_following_position = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(self.page[-1], self.ordering) if has_following_position else None
+        )
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else self.next_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page else self.previous_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _position_filter(self, position, reverse, model):
+        created_at, pk = self._split_position(position, model)
+        # Test for: (cursor reversed) XOR (queryset reversed)
+        lookup = 'lt' if reverse != self.ordering[0].startswith('-') else 'gt'
+        return Q(**{f'created_at__{lookup}': created_at}) | Q(created_at=created_at, **{f'id__{lookup}': pk})
+
+    def _split_position(self, position, model):
+        created_at, _, pk = position.rpartition(self.position_separator)
+        try:
+            # well formed but impossible timestamps (month 13) raise ValueError
+            created_at = parse_datetime(created_at) if created_at else None
+            pk = model._meta.pk.to_python(pk) if pk else None
+        except (ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None or pk is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            created_at, pk = instance['created_at'], instance['id']
+        else:
+            created_at, pk = instance.created_at, instance.pk
+        return f'{created_at.isoformat()}{self.position_separator}{pk}'
+
+    @staticmethod
+    def _flip(order):
+        return order[1:] if order.startswith('-') else f'-{order}'
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Keeps limit/offset as the default and switches to keyset pagination
+    when the request carries a `cursor` parameter (`?cursor=` for the first page).
+    """
+    cursor_pagination_class = CreatedAtCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() counting and reading the page through the async ORM"""
+        self.cursor_paginator = None
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return await self.cursor_paginator.apaginate_queryset(queryset, request, view)
+
+        # LimitOffsetPagination.paginate_queryset
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [row async for row in queryset[self.offset:self.offset + self.limit]]
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
@@ -0,0 +1,80 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+ORGANIZATION_MEMBERSHIP_CACHE_KEY = 'org_membership_{user_id}'
+
+
+def get_cached_organization_ids(user):
+    """
+    Ids of the organizations a user belongs to, read through the shared cache.
+    Entries are dropped by core.signals whenever Organization.users changes.
+    """
+    key = ORGANIZATION_MEMBERSHIP_CACHE_KEY.format(user_id=user.pk)
+    organization_ids = cache.get(key)
+    if organization_ids is None:
+        organization_ids = frozenset(user.belonging_organization.values_list('id', flat=True))
+        cache.set(key, organization_ids, settings.ORGANIZATION_MEMBERSHIP_CACHE_TIMEOUT)
+    return organization_ids
+
+
+def invalidate_organization_membership(user_ids):
+    """
+    Drop the cached memberships of the given users, right away and again once the current transaction
+    commits - a request reading the old rows in between would otherwise cache them until the timeout,
+    leaving a removed user with access.
+    """
+    keys = [ORGANIZATION_MEMBERSHIP_CACHE_KEY.format(user_id=user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(partial(cache.delete_many, keys))
+
+
+def get_user_organization_ids(request):
+    """
+    Ids of the organizations visible to the authenticated user.
+    Resolved once per request and memoized on the underlying HttpRequest, so views,
+    permissions and serializers of the same request share a single lookup.
+    """
+    # DRF wraps the Django request - memoize on the wrapped one so both layers see it
+    http_request = getattr(request, '_request', request)
+
+    organization_ids = getattr(http_request, '_organization_ids', None)
+    if organization_ids is None:
+        user = request.user
+        if user is None or not user.is_authenticated:
+            organization_ids = frozenset()
+        else:
+            organization_ids = get_cached_organization_ids(user)
+        http_request._organization_ids = organization_ids
+    return organization_ids
+
+
+async def aget_cached_organization_ids(user):
+    """Async get_cached_organization_ids(), for views running on the event loop"""
+    key = ORGANIZATION_MEMBERSHIP_CACHE_KEY.format(user_id=user.pk)
+    organization_ids = await cache.aget(key)
+    if organization_ids is None:
+        organization_ids = frozenset([pk async for pk in user.belonging_organization.values_list('id', flat=True)])
+        await cache.aset(key, organization_ids, settings.ORGANIZATION_MEMBERSHIP_CACHE_TIMEOUT)
+    return organization_ids
+
+
+async def aget_user_organization_ids(request):
+    """
+    Async get_user_organization_ids(), sharing its per-request memo -
+    sync code of the same request (permissions, get_queryset) reads it afterwards without a query.
+    """
+    http_request = getattr(request, '_request', request)
+
+    organization_ids = getattr(http_request, '_organization_ids', None)
+    if organization_ids is None:
+        user = request.user
+        if user is None or not user.is_authenticated:
+            organization_ids = frozenset()
+        else:
+            organization_ids = await aget_cached_organization_ids(user)
+        http_request._organization_ids = organization_ids
+    return organization_ids
@@ -1,3 +1,100 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Organization
+from notifications.models import Notification
+from users.models import BaseUser, UserTypeChoices
+
+
+@override_settings(HISTORY_WRITE_MODE='on_commit')
+class BufferedHistoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = BaseUser.objects.create_user(
+            email='history@example.com', first_name='His', last_name='Tory', user_type=UserTypeChoices.MEMBER
+        )
+
+    def test_history_rows_are_bulk_inserted_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            with transaction.atomic():
+                organizations = [Organization.objects.create(name=f'Org {i}') for i in range(3)]
+                organizations[0].name = 'Renamed'
+                organizations[0].save()
+            self.assertFalse(Organization.history.exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "core_historicalorganization"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Organization.history.count(), 4)
+        self.assertEqual(organizations[0].history.first().name, 'Renamed')
+
+    def test_rows_of_rolled_back_savepoint_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Organization.objects.create(name='Kept')
+                try:
+                    with transaction.atomic():
+                        Organization.objects.create(name='Dropped')
+                        raise ValueError
+                except ValueError:
+                    pass
+
+        self.assertEqual(list(Organization.history.values_list('name', flat=True)), ['Kept'])
+
+    def test_opt_outs(self):
+        self.assertFalse(hasattr(Notification, 'history'))
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Changed'
+            self.user.save(update_fields=['first_name', 'last_login'])
+        self.assertEqual(self.user.history.get().first_name, 'Changed')
+
+
+class SlidingSessionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = BaseUser.objects.create_user(
+            email='session@example.com', first_name='Ses', last_name='Sion', user_type=UserTypeChoices.MANAGER
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('list-project-stats')
+
+    def session_queries(self, now):
+        with mock.patch('common.middleware.time.time', return_value=now):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in queries if 'django_session' in q['sql']], response
+
+    def test_expiry_is_refreshed_once_per_interval(self):
+        start = time.time()
+        self.session_queries(start)  # stamps the session
+
+        # read from the cache, nothing written within the interval
+        queries, response = self.session_queries(start + 60)
+        self.assertEqual(queries, [])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+        interval = settings.SESSION_COOKIE_AGE * settings.SESSION_REFRESH_FRACTION
+        queries, response = self.session_queries(start + interval + 1)
+        self.assertTrue([sql for sql in queries if sql.startswith('UPDATE')])
+        self.assertEqual(response.cookies[settings.SESSION_COOKIE_NAME]['max-age'], settings.SESSION_COOKIE_AGE)
@@ -0,0 +1,76 @@
+import hashlib
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+ORGANIZATION_VERSION_CACHE_KEY = 'org_version_{organization_id}'
+
+
+def _fresh_version():
+    # seeded from the clock so a version lost from the cache never comes back with an old value
+    return time.time_ns() // 1000
+
+
+def get_organization_versions(organization_ids):
+    """Current version of each organization, {organization_id: version}"""
+    keys = {ORGANIZATION_VERSION_CACHE_KEY.format(organization_id=pk): pk for pk in organization_ids}
+    found = cache.get_many(keys)
+    missing = {key: _fresh_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+async def aget_organization_versions(organization_ids):
+    """Async get_organization_versions()"""
+    keys = {ORGANIZATION_VERSION_CACHE_KEY.format(organization_id=pk): pk for pk in organization_ids}
+    found = await cache.aget_many(keys)
+    missing = {key: _fresh_version() for key in keys if key not in found}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_organization_versions(organization_ids):
+    """
+    Move the given organizations to a new version, everything derived from the old one goes stale.
+    Done once the current transaction commits - bumped earlier, a concurrent reader could still see the
+    old rows and cache them under the new version.
+    """
+    organization_ids = set(organization_ids)  # evaluated now, the rows may be gone at commit
+    if organization_ids:
+        transaction.on_commit(partial(_bump_organization_versions, organization_ids))
+
+
+def _bump_organization_versions(organization_ids):
+    for organization_id in organization_ids:
+        key = ORGANIZATION_VERSION_CACHE_KEY.format(organization_id=organization_id)
+        try:
+            cache.incr(key)
+        except ValueError:  # not in the cache (yet / anymore)
+            cache.set(key, _fresh_version(), timeout=None)
+
+
+def get_versioned_cache_key(prefix, organization_ids, *parts):
+    """
+    Cache key bound to the current version of every given organization.
+    A bump makes every key derived from the old version unreachable - stale entries age out by timeout.
+    """
+    return _versioned_cache_key(prefix, get_organization_versions(organization_ids), parts)
+
+
+async def aget_versioned_cache_key(prefix, organization_ids, *parts):
+    """Async get_versioned_cache_key()"""
+    return _versioned_cache_key(prefix, await aget_organization_versions(organization_ids), parts)
+
+
+def _versioned_cache_key(prefix, versions, parts):
+    fingerprint = '|'.join([
+        ','.join(f'{pk}:{version}' for pk, version in sorted(versions.items())),
+        *(str(part) for part in parts),
+    ])
+    return f'{prefix}:{hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()}'
@@ -1,3 +1,84 @@
-from django.shortcuts import render
+import inspect
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.utils.functional import classproperty
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.generics import GenericAPIView
+from rest_framework.views import APIView
+
+
+class AsyncAPIViewMixin:
+    """
+    Runs DRF views with coroutine handlers natively under ASGI - no thread per request.
+    The session user is loaded through the async ORM, after that authentication and permission checks
+    touch no database and run on the event loop. Only credentials that need a lookup / password hash
+    (Basic auth without a session) go through one sync_to_async hop.
+    Handlers use the async ORM, sync handlers (OPTIONS) still work.
+    """
+
+    @classproperty
+    def view_is_async(cls):
+        return True
+
+    async def dispatch(self, request, *args, **kwargs):
+        # APIView.dispatch, awaiting the handler
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if await self.resolve_session_user(request):
+                self.initial(request, *args, **kwargs)
+            else:
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    @staticmethod
+    async def resolve_session_user(request):
+        """
+        Load the session user without blocking, returns whether authentication can now run on the event loop
+        """
+        http_request = request._request
+        user = getattr(http_request, '_cached_user', None)
+        if user is None and hasattr(http_request, 'auser'):
+            user = await http_request.auser()
+        if user is None:
+            return False
+        http_request.user = user
+        return user.is_authenticated or 'HTTP_AUTHORIZATION' not in http_request.META
+
+
+class AsyncAPIView(AsyncAPIViewMixin, APIView):
+    pass
+
+
+class AsyncGenericAPIView(AsyncAPIViewMixin, GenericAPIView):
+    pass
+
+
+def dispatch_by_method(async_view, sync_view, methods=('GET', 'HEAD')):
+    """
+    One URL served by two views: `methods` go to the async view, everything else (writes) to the sync one.
+    """
+    async def view(request, *args, **kwargs):
+        if request.method in methods:
+            return await async_view(request, *args, **kwargs)
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+    return csrf_exempt(view)
@@ -0,0 +1,93 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from users.models import BaseUser
+from .models import Tasks
+
+ACTIVITY_FIELDS = ['status', 'priority', 'due_date']
+
+HISTORY_TYPES = {
+    '+': 'created',
+    '~': 'updated',
+    '-': 'deleted',
+}
+
+
+class TaskActivity:
+    """
+    Field level change timeline of a task, newest first, read from the history tables.
+    A page is one ordered scan of the history rows plus the row just before it, assignee snapshots
+    and user emails come with one query each - consecutive rows are diffed in a single pass.
+    """
+
+    def __init__(self, task, limit=20):
+        self.task = task
+        self.limit = limit
+
+    def get_page(self, before=None):
+        """(entries, position of the next page or None), `before` is a position from a previous page"""
+        # history_date, not history_id, is the order of events - rows buffered in nested savepoints
+        # are inserted by their own flush, after the rows of the enclosing transaction
+        history = Tasks.history.filter(id=self.task.pk).order_by('-history_date', '-history_id')
+        if before is not None:
+            history_date, history_id = self.parse_position(before)
+            history = history.filter(Q(history_date__lt=history_date) | Q(history_date=history_date, history_id__lt=history_id))
+        # one extra row - the version the oldest entry of the page is diffed against
+        rows = list(history.values('history_id', 'history_date', 'history_type', 'history_user_id', *ACTIVITY_FIELDS)[:self.limit + 1])
+
+        assignees = {row['history_id']: set() for row in rows}
+        AssigneeHistory = Tasks.history.model.assignees.model
+        for history_id, user_id in AssigneeHistory.objects.filter(history_id__in=assignees).values_list('history_id', 'baseuser_id'):
+            assignees[history_id].add(user_id)
+
+        for row in rows:
+            row['assignees'] = assignees[row['history_id']]
+
+        user_ids = ({row['history_user_id'] for row in rows} | set().union(*assignees.values())) - {None}
+        users = {user['id']: user for user in BaseUser.objects.filter(id__in=user_ids).values('id', 'email')} if user_ids else {}
+
+        entries = []
+        for row, previous in zip(rows[:self.limit], rows[1:self.limit + 1] + [None]):
+            changes = self.diff(previous, row, users)
+            if changes or row['history_type'] != '~':
+                entries.append({
+                    'id': row['history_id'],
+                    'action': HISTORY_TYPES[row['history_type']],
+                    'date': row['history_date'],
+                    'user': users.get(row['history_user_id']),
+                    'changes': changes,
+                })
+
+        next_before = self.format_position(rows[self.limit - 1]) if len(rows) > self.limit else None
+        return entries, next_before
+
+    @staticmethod
+    def format_position(row):
+        return f"{row['history_date'].isoformat()}|{row['history_id']}"
+
+    @staticmethod
+    def parse_position(position):
+        """(history_date, history_id) of a position, ValueError when malformed"""
+        history_date, _, history_id = position.rpartition('|')
+        history_date = parse_datetime(history_date)
+        if history_date is None:
+            raise ValueError("invalid position")
+        return history_date, int(history_id)
+
+    @staticmethod
+    def diff(old, new, users):
+        """Changes from version `old` (None for the first one) to `new`"""
+        changes = []
+        for field in ACTIVITY_FIELDS:
+            old_value = old[field] if old else None
+            if old_value != new[field]:
+                changes.append({'field': field, 'old': old_value, 'new': new[field]})
+
+        old_assignees = old['assignees'] if old else set()
+        if old_assignees != new['assignees']:
+            changes.append({
+                'field': 'assignees',
+                'added': [users.get(pk, {'id': pk}) for pk in sorted(new['assignees'] - old_assignees)],
+                'removed': [users.get(pk, {'id': pk}) for pk in sorted(old_assignees - new['assignees'])],
+            })
+        return changes
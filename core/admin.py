@@ -1,7 +1,10 @@
 from django.contrib import admin
 
-from .models import Organization, Projects, Tasks
+from .models import AttachmentBlob, Organization, Projects, ProjectTaskCounter, TaskAttachment, Tasks
 
 admin.site.register(Organization)
 admin.site.register(Projects)
 admin.site.register(Tasks)
+admin.site.register(ProjectTaskCounter)
+admin.site.register(AttachmentBlob)
+admin.site.register(TaskAttachment)
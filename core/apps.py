@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        import core.signals
+
+        post_migrate.connect(core.signals.setup_search_index, sender=self)
@@ -0,0 +1,117 @@
+import mimetypes
+import re
+from functools import partial
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single `bytes=` range, None when there is no usable Range header
+    (multiple ranges are answered with the whole file). Raises ValueError when unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), int(last) if last else size - 1
+    else:  # suffix range - the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def iter_file_range(handle, start, length, block_size=64 * 1024):
+    try:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        handle.close()
+
+
+async def aiter_file_range(handle, start, length, block_size=64 * 1024):
+    """iter_file_range for ASGI - each block is read on a worker thread, the event loop never blocks"""
+    try:
+        await sync_to_async(handle.seek, thread_sensitive=False)(start)
+        while length > 0:
+            data = await sync_to_async(handle.read, thread_sensitive=False)(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        await sync_to_async(handle.close, thread_sensitive=False)()
+
+
+def is_asgi_request(request):
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def streaming_response(request, iter_chunks, aiter_chunks, **kwargs):
+    """
+    StreamingHttpResponse over `iter_chunks()`, or over the async `aiter_chunks()` under ASGI -
+    Daphne reads a sync iterator whole into memory before sending anything, an async one is streamed.
+    Only the generator matching the server is created.
+    """
+    return StreamingHttpResponse(aiter_chunks() if is_asgi_request(request) else iter_chunks(), **kwargs)
+
+
+def file_download_response(request, name, filename, content_type=''):
+    """
+    Response sending the stored file `name` as `filename`.
+    With ATTACHMENT_DOWNLOAD_BACKEND set the transfer is handed to the front server
+    (X-Accel-Redirect for nginx, X-Sendfile for Apache / lighttpd), which also serves Range requests.
+    Otherwise a FileResponse, zero copy through wsgi.file_wrapper for whole files, 206 for single byte ranges.
+    Under ASGI the file is streamed from an async generator.
+    """
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    backend = settings.ATTACHMENT_DOWNLOAD_BACKEND
+
+    if backend == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX + name)
+    elif backend == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = default_storage.path(name)
+    else:
+        size = default_storage.size(name)
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        handle = default_storage.open(name, 'rb')
+        if byte_range is None and not is_asgi_request(request):
+            response = FileResponse(handle, content_type=content_type)
+        else:
+            start, end = byte_range or (0, size - 1)
+            response = streaming_response(
+                request,
+                partial(iter_file_range, handle, start, end - start + 1),
+                partial(aiter_file_range, handle, start, end - start + 1),
+                status=206 if byte_range else 200, content_type=content_type
+            )
+            if byte_range:
+                response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+
+    response['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    response['Cache-Control'] = 'private'
+    return response
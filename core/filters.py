@@ -3,9 +3,16 @@ import django_filters
 from core.models import Tasks
 
 
+class ChoiceInFilter(django_filters.BaseInFilter, django_filters.ChoiceFilter):
+    """
+    Exact match on one or more comma separated choices, e.g. ?status=TODO,IN_PROGRESS
+    Compiles to `= / IN (...)`, which the composite task indexes can serve.
+    """
+
+
 class TaskFilters(django_filters.FilterSet):
-    status = django_filters.CharFilter(lookup_expr='icontains')
-    priority = django_filters.CharFilter(lookup_expr='icontains')
+    status = ChoiceInFilter(choices=Tasks.STATUS_CHOICES, lookup_expr='in')
+    priority = ChoiceInFilter(choices=Tasks.PRIORITY_CHOICES, lookup_expr='in')
     due_date = django_filters.DateFromToRangeFilter()
     class Meta:
         model = Tasks
@@ -0,0 +1,171 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history
+
+from common.history import bulk_history_m2m_snapshot
+from common.versions import bump_organization_versions
+from core.models import Projects, ProjectTaskCounter, Tasks
+from core.search import get_search_backend
+from core.serilizers import BulkTaskSerializer
+from users.models import BaseUser
+
+
+class Command(BaseCommand):
+    """
+    Loads tasks in batches with bulk_create.
+    Per-row signals never fire - history, assignee links, project task counters and
+    the search index are written in bulk for every batch instead.
+    Accepts the files produced by /core/tasks/export/: `project_id` (or `project` as id / slug),
+    `assignees` as ids or emails (space / comma separated in CSV, a list in NDJSON).
+    """
+    help = "Bulk import tasks from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or NDJSON file")
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help="Defaults from the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tasks inserted per batch")
+        parser.add_argument('--user', help="Email of the user recorded as creator and in the history")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+
+        user = None
+        if options['user']:
+            user = BaseUser.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} does not exist")
+
+        started = time.monotonic()
+        imported = rejected = 0
+        try:
+            with open(path, newline='', encoding='utf-8') as handle:
+                rows = self.read_csv(handle) if input_format == 'csv' else self.read_ndjson(handle)
+                while True:
+                    batch = list(islice(rows, batch_size))
+                    if not batch:
+                        break
+                    created, errors = self.import_batch(batch, user)
+                    imported += created
+                    rejected += len(errors)
+                    for line, error in errors:
+                        self.stderr.write(f"line {line}: {error}")
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f"{imported} tasks imported ({imported / (time.monotonic() - started):.0f}/s)")
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} tasks, rejected {rejected}, in {elapsed:.1f}s "
+            f"({imported / max(elapsed, 1e-6):.0f} tasks/s)"
+        ))
+
+    @staticmethod
+    def read_csv(handle):
+        """(line, row) pairs, empty cells dropped and assignees split"""
+        reader = csv.DictReader(handle)
+        for row in reader:
+            row = {key: value for key, value in row.items() if key and value not in ('', None)}
+            if 'assignees' in row:
+                row['assignees'] = row['assignees'].replace(',', ' ').split()
+            yield reader.line_num, row
+
+    @staticmethod
+    def read_ndjson(handle):
+        for line, text in enumerate(handle, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                row = f"invalid JSON: {e}"
+            yield line, row
+
+    def import_batch(self, batch, user):
+        """Validate and insert one batch of (line, row) pairs, returns (created count, [(line, error)])"""
+        errors = []
+        rows = []
+        for line, row in batch:
+            if isinstance(row, dict):
+                rows.append((line, row))
+            else:
+                errors.append((line, row if isinstance(row, str) else "expected an object"))
+
+        # Resolve every project / assignee reference of the batch in one query each
+        project_refs = {self._project_ref(row) for _, row in rows}
+        projects = {}
+        for project in Projects.objects.filter(
+            Q(id__in=[ref for ref in project_refs if ref.isdigit()]) | Q(slug__in=project_refs)
+        ).select_related('organization'):
+            projects[str(project.id)] = projects[project.slug] = project
+
+        user_refs = {str(ref) for _, row in rows for ref in row.get('assignees') or []}
+        users = {}
+        if user_refs:
+            for user_id, email in BaseUser.objects.filter(
+                Q(id__in=[ref for ref in user_refs if ref.isdigit()]) | Q(email__in=user_refs)
+            ).values_list('id', 'email'):
+                users[str(user_id)] = users[email] = user_id
+
+        tasks, assignments, counter_deltas = [], [], {}
+        for line, row in rows:
+            project = projects.get(self._project_ref(row))
+            if project is None:
+                errors.append((line, "unknown project"))
+                continue
+            assignee_refs = [str(ref) for ref in row.get('assignees') or []]
+            unknown = [ref for ref in assignee_refs if ref not in users]
+            if unknown:
+                errors.append((line, f"unknown assignees {unknown}"))
+                continue
+
+            data = {field: row[field] for field in BulkTaskSerializer.Meta.fields if field in row and field != 'id'}
+            data['project'] = project.id
+            data.pop('assignees', None)
+            serializer = BulkTaskSerializer(data=data)
+            if not serializer.is_valid():
+                errors.append((line, serializer.errors))
+                continue
+
+            fields = dict(serializer.validated_data)
+            fields.pop('project')
+            task = Tasks(project=project, created_by=user, updated_by=user, **fields)
+            if assignee_refs:
+                assignments.append((len(tasks), {users[ref] for ref in assignee_refs}))
+            tasks.append(task)
+            key = (project.id, task.status)
+            counter_deltas[key] = counter_deltas.get(key, 0) + 1
+
+        if tasks:
+            Assignees = Tasks.assignees.through
+            with transaction.atomic():
+                # rows + history in bulk, returns the saved tasks (re-read on backends without RETURNING)
+                now = timezone.now()
+                created = bulk_create_with_history(tasks, Tasks, default_user=user, default_date=now)
+                Assignees.objects.bulk_create([
+                    Assignees(tasks_id=created[index].pk, baseuser_id=user_id)
+                    for index, user_ids in assignments for user_id in user_ids
+                ])
+                bulk_history_m2m_snapshot(Tasks, created, now)
+                ProjectTaskCounter.apply_deltas(counter_deltas)
+                for task, saved in zip(tasks, created):
+                    saved.project = task.project
+                get_search_backend().index(created)
+                bump_organization_versions({task.project.organization_id for task in tasks})
+
+        return len(tasks), errors
+
+    @staticmethod
+    def _project_ref(row):
+        return str(row.get('project_id', row.get('project', '')))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Tasks
+from core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the task full-text search index from the tasks table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched per round trip")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.setup()
+
+        rows = Tasks.objects.order_by().values_list(
+            'id', 'project__organization_id', 'title', 'description'
+        ).iterator(chunk_size=options['chunk_size'])
+        with transaction.atomic():
+            count = backend.rebuild(rows)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} tasks"))
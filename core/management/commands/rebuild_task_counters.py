@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.models import ProjectTaskCounter
+
+
+class Command(BaseCommand):
+    help = "Recount tasks by status and rebuild the per-project task counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', dest='projects',
+                            help="Only rebuild the counters of this project id (repeatable)")
+
+    def handle(self, *args, **options):
+        counters = ProjectTaskCounter.rebuild(project_ids=options['projects'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt task counters for {len(counters)} projects"))
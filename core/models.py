@@ -1,4 +1,5 @@
 import datetime
+import uuid
 
 from django.db import models
 from autoslug import AutoSlugField
@@ -64,19 +65,25 @@ class Projects(BaseModels):
     def get_project_slug(self):
         return f"{self.name}_{self.organization.name}"
 
+    def get_task_counter(self):
+        """Denormalized task counts, built from the tasks table on first use"""
+        try:
+            return self.task_counter
+        except ProjectTaskCounter.DoesNotExist:
+            self.task_counter = ProjectTaskCounter.rebuild(project_ids=[self.pk])[0]
+            return self.task_counter
+
     @property
     def task_count(self):
-        return self.tasks.count()
+        return self.get_task_counter().total
 
     @property
     def completed_tasks_count(self):
-        return self.tasks.filter(status='DONE').count()
+        return self.get_task_counter().done_count
 
     @property
     def completion_rate(self):
-        if self.task_count == 0:
-            return 0
-        return (self.completed_tasks_count / self.task_count) * 100
+        return self.get_task_counter().completion_rate
 
 
 class Tasks(BaseModels):
@@ -128,8 +135,24 @@ class Tasks(BaseModels):
     attachments = models.FileField(upload_to='optional_uploads/', blank=True, null=True)
     slug = AutoSlugField(populate_from="get_task_slug")
 
+    # assignee changes are kept in the history too (task activity timeline)
+    _history_m2m_fields = ['assignees']
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),  # keyset pagination
+            # TaskFilters access patterns, always within the project scope
+            models.Index(fields=['project', 'status', 'due_date'], name='task_project_status_due_idx'),
+            models.Index(fields=['project', 'priority'], name='task_project_priority_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the loaded project / status, project task counters are adjusted from it on save and delete
+        instance._loaded_counter_key = (instance.__dict__.get('project_id'), instance.__dict__.get('status'))
+        return instance
 
     # generate custom task slug
     def get_task_slug(self):
@@ -137,3 +160,138 @@ class Tasks(BaseModels):
 
     def __str__(self):
         return f"{self.project.name} - {self.title}"
+
+
+class ProjectTaskCounter(models.Model):
+    """
+    Denormalized task counts of a project, by status.
+    Kept up to date by core.signals on task save / delete / status change,
+    rebuilt from the tasks table with `manage.py rebuild_task_counters`.
+    """
+
+    # task status -> counter column
+    STATUS_FIELDS = {
+        'TODO': 'todo_count',
+        'IN_PROGRESS': 'in_progress_count',
+        'DONE': 'done_count',
+    }
+
+    project = models.OneToOneField(Projects, on_delete=models.CASCADE, related_name='task_counter')
+    todo_count = models.IntegerField(default=0)
+    in_progress_count = models.IntegerField(default=0)
+    done_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.project_id} - {self.total} tasks"
+
+    @property
+    def total(self):
+        return self.todo_count + self.in_progress_count + self.done_count
+
+    @property
+    def completion_rate(self):
+        if self.total == 0:
+            return 0
+        return (self.done_count / self.total) * 100
+
+    @classmethod
+    def apply_deltas(cls, deltas, build_missing=True):
+        """
+        Apply {(project_id, status): delta} to the counters with one UPDATE per project.
+        Projects without a counter row yet get theirs built from the tasks table, unless build_missing is off
+        (deletes - the project may be going away with its tasks).
+        """
+        per_project = {}
+        for (project_id, status), delta in deltas.items():
+            if delta and project_id is not None and status in cls.STATUS_FIELDS:
+                changes = per_project.setdefault(project_id, {})
+                field = cls.STATUS_FIELDS[status]
+                changes[field] = changes.get(field, 0) + delta
+
+        missing = []
+        for project_id, changes in per_project.items():
+            updated = cls.objects.filter(project_id=project_id).update(
+                **{field: models.F(field) + delta for field, delta in changes.items()}
+            )
+            if not updated:
+                missing.append(project_id)
+        if missing and build_missing:
+            cls.rebuild(project_ids=missing)
+
+    @classmethod
+    def rebuild(cls, project_ids=None):
+        """Recount tasks by status and upsert the counter rows (all projects when project_ids is None)"""
+        projects = Projects.objects.all() if project_ids is None else Projects.objects.filter(pk__in=project_ids)
+        counters = {pk: cls(project_id=pk) for pk in projects.values_list('pk', flat=True)}
+
+        tasks = (Tasks.objects.all() if project_ids is None else Tasks.objects.filter(project_id__in=counters)).order_by()
+        for project_id, status, count in tasks.values_list('project_id', 'status').annotate(count=models.Count('id')):
+            if status in cls.STATUS_FIELDS:
+                setattr(counters[project_id], cls.STATUS_FIELDS[status], count)
+
+        return cls.objects.bulk_create(
+            counters.values(),
+            update_conflicts=True,
+            unique_fields=['project'],
+            update_fields=list(cls.STATUS_FIELDS.values()),
+        )
+
+
+def attachment_blob_path(instance, filename):
+    # content addressed - the same bytes always land on the same path
+    return f"attachments/blobs/{instance.sha256[:2]}/{instance.sha256}"
+
+
+class AttachmentBlob(models.Model):
+    """
+    Stored attachment content, keyed by its SHA-256.
+    Identical files uploaded to any number of tasks are kept once.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    file = models.FileField(upload_to=attachment_blob_path, max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.size} bytes)"
+
+
+class TaskAttachment(models.Model):
+    """
+    A file attached to a task, uploaded in chunks.
+    While UPLOADING the received bytes sit in a part file and `offset` is where the next chunk starts,
+    a client resumes an interrupted upload from there. Once complete it points at the deduplicated blob.
+    Not history tracked - `offset` changes with every chunk.
+    """
+
+    STATUS_CHOICES = [
+        ('UPLOADING', 'Uploading'),
+        ('COMPLETE', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Tasks, on_delete=models.CASCADE, related_name='task_attachments')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)  # optional, checked on completion when given
+    offset = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='UPLOADING')
+    blob = models.ForeignKey(AttachmentBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='attachments')
+
+    created_by = models.ForeignKey(
+        BaseUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='uploaded_attachments'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def part_name(self):
+        """Storage name of the part file collecting the chunks"""
+        return f"attachments/uploads/{self.pk}.part"
+
+    def __str__(self):
+        return f"{self.task_id} - {self.filename}"
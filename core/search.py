@@ -0,0 +1,123 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+
+class BaseTaskSearchBackend:
+    """
+    Inverted index over task titles and descriptions.
+    Backends keep their own index in sync through index() / remove(), which core.signals
+    and the bulk task paths call, and answer ranked, organization scoped queries.
+    """
+
+    def setup(self):
+        """Create the index storage if needed (run after migrate)"""
+
+    def index(self, tasks):
+        """Add or refresh the given tasks (project must be loaded or cheap to load)"""
+        raise NotImplementedError
+
+    def remove(self, task_ids):
+        raise NotImplementedError
+
+    def rebuild(self, rows):
+        """Drop the whole index and fill it from (task_id, organization_id, title, description) rows, returns the count"""
+        raise NotImplementedError
+
+    def search(self, query, organization_ids, limit=20, offset=0):
+        """Task ids matching the query, best match first"""
+        raise NotImplementedError
+
+
+class SQLiteFTS5Backend(BaseTaskSearchBackend):
+    """
+    SQLite FTS5 virtual table keyed by task id (rowid), ranked with bm25 - titles weigh more than descriptions.
+    The organization id is stored unindexed next to the text to scope results without a join.
+    """
+    table = 'core_task_search'
+    title_weight = 10.0
+    description_weight = 1.0
+    batch_size = 500
+
+    def setup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                f"USING fts5(organization_id UNINDEXED, title, description)"
+            )
+
+    def index(self, tasks):
+        rows = [(task.pk, task.project.organization_id, task.title, task.description or '') for task in tasks]
+        if not rows:
+            return
+        self.remove([row[0] for row in rows])
+        with connection.cursor() as cursor:
+            self._insert(cursor, rows)
+
+    def remove(self, task_ids):
+        task_ids = list(task_ids)
+        with connection.cursor() as cursor:
+            for start in range(0, len(task_ids), self.batch_size):
+                batch = task_ids[start:start + self.batch_size]
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(batch))})",
+                    batch
+                )
+
+    def rebuild(self, rows):
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._insert(cursor, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._insert(cursor, batch)
+                count += len(batch)
+        return count
+
+    def search(self, query, organization_ids, limit=20, offset=0):
+        match = self.build_match_expression(query)
+        organization_ids = list(organization_ids)
+        if not match or not organization_ids:
+            return []
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} "
+                f"WHERE {self.table} MATCH %s AND organization_id IN ({', '.join(['%s'] * len(organization_ids))}) "
+                f"ORDER BY bm25({self.table}, 0.0, %s, %s) LIMIT %s OFFSET %s",
+                [match, *organization_ids, self.title_weight, self.description_weight, limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def build_match_expression(query):
+        """
+        Turn free text into a safe FTS5 expression: every word must match, the last one as a prefix
+        so results show up while typing. Quoting each term keeps FTS5 operators in user input inert.
+        """
+        terms = re.findall(r'\w+', query or '')
+        if not terms:
+            return ''
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+
+    def _insert(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT INTO {self.table} (rowid, organization_id, title, description) VALUES (%s, %s, %s, %s)",
+            rows
+        )
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    return import_string(settings.TASK_SEARCH_BACKEND)()
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import Organization, Projects, Tasks
+from .models import Organization, Projects, ProjectTaskCounter, TaskAttachment, Tasks
 from users.models import BaseUser
 
 class UserListingSerializer(serializers.ModelSerializer):
@@ -94,4 +94,49 @@ class TaskSerializer(serializers.ModelSerializer):
         if not project:
             raise serializers.ValidationError(f"Organization {project.name} do not exist.")
 
-        return value
\ No newline at end of file
+        return value
+
+class BulkTaskSerializer(serializers.ModelSerializer):
+    """
+    Validates a single item of a bulk task request.
+    References (project, assignees) are plain ids so validation runs without queries,
+    they are resolved for the whole batch at once by the bulk service.
+    """
+    id = serializers.IntegerField(required=False)
+    project = serializers.IntegerField()
+    title = serializers.CharField(max_length=200)
+    type = serializers.ChoiceField(choices=Tasks.TASK_GROUP_CHOICES, required=False)
+    priority = serializers.ChoiceField(choices=Tasks.PRIORITY_CHOICES, required=False)
+    status = serializers.ChoiceField(choices=Tasks.STATUS_CHOICES, required=False)
+    due_date = serializers.DateField(required=False)
+    assignees = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=50)
+
+    class Meta:
+        model = Tasks
+        fields = ['id', 'title', 'type', 'project', 'description', 'priority', 'status', 'due_date', 'assignees']
+
+
+class ProjectTaskCounterSerializer(serializers.ModelSerializer):
+    project_name = serializers.CharField(source='project.name', read_only=True)
+    total = serializers.IntegerField(read_only=True)
+    completion_rate = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ProjectTaskCounter
+        fields = ['project', 'project_name', 'todo_count', 'in_progress_count', 'done_count', 'total', 'completion_rate']
+
+
+class TaskAttachmentSerializer(serializers.ModelSerializer):
+    """Upload state of a task attachment, `offset` is where a resumed upload continues"""
+
+    class Meta:
+        model = TaskAttachment
+        fields = ['id', 'task', 'filename', 'content_type', 'size', 'sha256', 'offset', 'status', 'created_at']
+        read_only_fields = fields
+
+
+class StartAttachmentUploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=0)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True, default='')
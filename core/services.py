@@ -0,0 +1,162 @@
+from django.db import transaction
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from common.history import bulk_history_m2m_snapshot
+from common.versions import bump_organization_versions
+from notifications.outbox import notification_outbox
+from notifications.signals import status_notification_type
+from notifications.tasks import relay_notification_outbox
+from .models import Organization, Projects, ProjectTaskCounter, Tasks
+from .search import get_search_backend
+from .serilizers import BulkTaskSerializer
+
+
+class TaskBulkService:
+    """
+    Creates and updates many tasks with a fixed number of statements:
+    references are resolved once per batch, rows, assignee links and history
+    are written with bulk operations and notification events go to the outbox in one insert.
+    """
+    max_batch_size = 500
+    update_fields = ['title', 'type', 'description', 'priority', 'status', 'due_date', 'project']
+
+    def bulk_create_update(self, items, user, organization_ids, has_permission=None):
+        """
+        Apply a list of task payloads - items carrying an `id` update that task,
+        the others create a new one. Returns one result per item, in order.
+        `has_permission(task)` decides whether an existing task may be updated, refused items get a 403 error.
+        """
+        results = [None] * len(items)
+
+        # Validate every item on its own, validation is query free
+        valid = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = self._error(index, {'non_field_errors': ['Expected an object.']})
+                continue
+            serializer = BulkTaskSerializer(data=item, partial='id' in item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = self._error(index, serializer.errors)
+
+        # Resolve references for the whole batch
+        projects = Projects.objects.select_related('organization').filter(
+            organization_id__in=organization_ids
+        ).in_bulk({data['project'] for _, data in valid if 'project' in data})
+        # assignees prefetched for the object permission checks and the assignee diff
+        existing = Tasks.objects.select_related('project__organization').prefetch_related('assignees').filter(
+            project__organization_id__in=organization_ids
+        ).in_bulk({data['id'] for _, data in valid if 'id' in data})
+        memberships = set(Organization.users.through.objects.filter(
+            organization_id__in=organization_ids,
+            baseuser_id__in={user_id for _, data in valid for user_id in data.get('assignees', [])}
+        ).values_list('organization_id', 'baseuser_id'))
+        Assignees = Tasks.assignees.through
+        old_assignees = {task.pk: {assignee.pk for assignee in task.assignees.all()} for task in existing.values()}
+
+        now = timezone.now()
+        to_create, to_update, assignments, events = [], [], [], []
+        counter_deltas = {}  # bulk writes skip the task signals, counters and search index are kept here
+        for index, data in valid:
+            data = dict(data)
+            assignees = data.pop('assignees', None)
+
+            if 'id' in data:
+                task = existing.get(data.pop('id'))
+                if task is None:
+                    results[index] = self._error(index, {'id': ['Task not found.']})
+                    continue
+                if has_permission is not None and not has_permission(task):
+                    results[index] = self._error(
+                        index, {'id': ['You do not have permission to update this task.']}, status_code=403
+                    )
+                    continue
+            else:
+                task = Tasks(created_by=user)
+
+            if 'project' in data:
+                project = projects.get(data.pop('project'))
+                if project is None:
+                    results[index] = self._error(index, {'project': ['Project not found.']})
+                    continue
+                task.project = project
+
+            if assignees is not None:
+                outsiders = [user_id for user_id in assignees if (task.project.organization_id, user_id) not in memberships]
+                if outsiders:
+                    results[index] = self._error(index, {'assignees': [f'Users {outsiders} are not members of the organization.']})
+                    continue
+
+            old_status, old_project_id = task.status, task.project_id
+            for field, value in data.items():
+                setattr(task, field, value)
+            task.updated_by = user
+            task.updated_at = now
+
+            new_key = (task.project_id, task.status)
+            if task.pk:
+                to_update.append((index, task))
+                if new_key != (old_project_id, old_status):
+                    counter_deltas[new_key] = counter_deltas.get(new_key, 0) + 1
+                    counter_deltas[(old_project_id, old_status)] = counter_deltas.get((old_project_id, old_status), 0) - 1
+                # same events as single saves / assignee changes (notifications.signals)
+                notification_type = status_notification_type(old_status, task.status)
+                if notification_type:
+                    events.append((task, notification_type))
+                if assignees is not None and set(assignees) != old_assignees.get(task.pk, set()):
+                    assignments.append((task, assignees))
+                    events.append((task, 'task_assigned'))
+            else:
+                to_create.append((index, task))
+                counter_deltas[new_key] = counter_deltas.get(new_key, 0) + 1
+                if assignees:
+                    assignments.append((task, assignees))
+                    events.append((task, 'task_assigned'))
+
+        # updated tasks whose assignee links get replaced, taken before created tasks get their pk
+        reassigned_ids = [task.pk for task, _ in assignments if task.pk]
+
+        with transaction.atomic():
+            if to_create:
+                bulk_create_with_history([task for _, task in to_create], Tasks, default_user=user, default_date=now)
+            if to_update:
+                bulk_update_with_history(
+                    [task for _, task in to_update], Tasks, self.update_fields + ['updated_by', 'updated_at'],
+                    default_user=user, default_date=now
+                )
+            if assignments:
+                Assignees.objects.filter(tasks_id__in=reassigned_ids).delete()
+                Assignees.objects.bulk_create([
+                    Assignees(tasks_id=task.pk, baseuser_id=user_id)
+                    for task, user_ids in assignments for user_id in set(user_ids)
+                ])
+            # the bulk history helpers skip the assignee snapshots the activity timeline diffs
+            bulk_history_m2m_snapshot(Tasks, [task for _, task in to_create + to_update], now)
+            if counter_deltas:
+                ProjectTaskCounter.apply_deltas(counter_deltas)
+            get_search_backend().index([task for _, task in to_create + to_update])
+            if events:
+                # fanned out by the outbox relay once the batch commits
+                notification_outbox.enqueue_events(events, sender=user)
+                transaction.on_commit(relay_notification_outbox.delay)
+            # bulk writes send no post_save, move the cached lists of the touched organizations on by hand
+            bump_organization_versions({task.project.organization_id for _, task in to_create + to_update})
+
+        for index, task in to_create:
+            results[index] = {'index': index, 'status': 'created', 'id': task.pk}
+        for index, task in to_update:
+            results[index] = {'index': index, 'status': 'updated', 'id': task.pk}
+        return results
+
+    @staticmethod
+    def _error(index, errors, status_code=None):
+        error = {'index': index, 'status': 'error', 'errors': errors}
+        if status_code is not None:
+            error['status_code'] = status_code
+        return error
+
+
+# Global instance
+task_bulk_service = TaskBulkService()
@@ -0,0 +1,121 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from common.resolvers import invalidate_organization_membership
+from common.versions import bump_organization_versions
+from .models import Organization, Projects, ProjectTaskCounter, Tasks
+from .search import get_search_backend
+
+
+@receiver(m2m_changed, sender=Organization.users.through)
+def invalidate_membership_on_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached memberships of every user whose organizations changed"""
+    if action == 'pre_clear' and not reverse:
+        # pk_set is not provided for clear(), collect the affected users before the rows go away
+        instance._cleared_user_ids = list(instance.users.values_list('id', flat=True))
+    elif action == 'post_clear':
+        invalidate_organization_membership([instance.pk] if reverse else instance.__dict__.pop('_cleared_user_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        if reverse:  # user.belonging_organization.add/remove(...)
+            invalidate_organization_membership([instance.pk])
+        elif pk_set:  # organization.users.add/remove(...)
+            invalidate_organization_membership(pk_set)
+
+
+@receiver(m2m_changed, sender=Organization.users.through)
+def bump_organization_version_on_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Project / task payloads embed the organization members - move affected organizations to a new version"""
+    if action == 'pre_clear' and reverse:
+        instance._cleared_organization_ids = list(instance.belonging_organization.values_list('id', flat=True))
+    elif action == 'post_clear':
+        bump_organization_versions(instance.__dict__.pop('_cleared_organization_ids', []) if reverse else [instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        bump_organization_versions((pk_set or []) if reverse else [instance.pk])
+
+
+@receiver(pre_delete, sender=Organization)
+def invalidate_membership_on_organization_deleted(sender, instance, **kwargs):
+    """Deleting an organization removes the through rows without m2m_changed"""
+    invalidate_organization_membership(instance.users.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Projects)
+def create_project_task_counter(sender, instance, created, **kwargs):
+    if created:
+        ProjectTaskCounter.objects.get_or_create(project=instance)
+
+
+@receiver(post_save, sender=Tasks)
+@receiver(post_delete, sender=Tasks)
+def bump_organization_version_on_task_changed(sender, instance, **kwargs):
+    # connected ahead of the counter receivers, which overwrite _loaded_counter_key
+    organization_ids = [instance.project.organization_id]
+    old_key = getattr(instance, '_loaded_counter_key', None)
+    if old_key and old_key[0] != instance.project_id:
+        # moved out of another project, possibly of another organization
+        organization_ids += Projects.objects.filter(pk=old_key[0]).values_list('organization_id', flat=True)
+    bump_organization_versions(organization_ids)
+
+
+@receiver(post_save, sender=Tasks)
+def update_task_counters_on_save(sender, instance, created, **kwargs):
+    """Move the task between project / status counters when it is created or its status / project changes"""
+    new_key = (instance.project_id, instance.status)
+    old_key = None if created else getattr(instance, '_loaded_counter_key', None)
+
+    if old_key != new_key:
+        if old_key is None and not created:
+            # saved through an instance that was not loaded from the DB, previous state is unknown
+            ProjectTaskCounter.rebuild(project_ids=[instance.project_id])
+        else:
+            deltas = {new_key: 1}
+            if old_key is not None:
+                deltas[old_key] = -1
+            ProjectTaskCounter.apply_deltas(deltas)
+    instance._loaded_counter_key = new_key
+
+
+@receiver(post_delete, sender=Tasks)
+def update_task_counters_on_delete(sender, instance, **kwargs):
+    key = getattr(instance, '_loaded_counter_key', None) or (instance.project_id, instance.status)
+    ProjectTaskCounter.apply_deltas({key: -1}, build_missing=False)
+
+
+def setup_search_index(sender, **kwargs):
+    """post_migrate - create the search index storage"""
+    get_search_backend().setup()
+
+
+@receiver(post_save, sender=Tasks)
+def index_task_on_save(sender, instance, **kwargs):
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Tasks)
+def remove_task_from_index(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def bump_organization_version_on_organization_changed(sender, instance, **kwargs):
+    bump_organization_versions([instance.pk])
+
+
+@receiver(post_save, sender=Projects)
+@receiver(post_delete, sender=Projects)
+def bump_organization_version_on_project_changed(sender, instance, **kwargs):
+    """Cached project / task lists of the organization are stale"""
+    bump_organization_versions([instance.organization_id])
+
+
+@receiver(m2m_changed, sender=Tasks.assignees.through)
+def bump_organization_version_on_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_organization_versions([instance.project.organization_id])
+    elif pk_set:  # user.assigned_tasks.add/remove(...)
+        bump_organization_versions(Tasks.objects.filter(pk__in=pk_set).values_list('project__organization_id', flat=True))
+    else:
+        bump_organization_versions(instance.belonging_organization.values_list('id', flat=True))
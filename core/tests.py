@@ -1,3 +1,989 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import hashlib
+import json
+import shutil
+import os
+import tempfile
+from functools import partial
+from io import StringIO
+from urllib.parse import urlencode
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from common.middleware import CurrentUserMiddleware, get_current_user
+from common.resolvers import ORGANIZATION_MEMBERSHIP_CACHE_KEY, get_cached_organization_ids, get_user_organization_ids
+from common.versions import get_organization_versions
+from notifications.models import Notification, NotificationOutbox
+from users.models import BaseUser, UserTypeChoices
+from .exports import TaskExporter
+from .filters import TaskFilters
+from .models import AttachmentBlob, Organization, Projects, ProjectTaskCounter, TaskAttachment, Tasks
+from .search import get_search_backend
+from .serilizers import TaskSerializer, ProjectSerilizer
+from .uploads import UploadError, chunked_upload_service
+from .views import ListCreateProjects, ListCreateTasks
+
+
+class CoreTestMixin:
+    """
+    Shared fixtures: one manager belonging to an organization with a single project.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = BaseUser.objects.create_user(
+            email='manager@example.com', first_name='Test', last_name='Manager',
+            user_type=UserTypeChoices.MANAGER, password='secret-pass-123'
+        )
+        cls.member = BaseUser.objects.create_user(
+            email='member@example.com', first_name='Test', last_name='Member',
+            user_type=UserTypeChoices.MEMBER, password='secret-pass-123'
+        )
+        cls.organization = Organization.objects.create(name='Acme')
+        cls.organization.users.add(cls.manager, cls.member)
+        cls.project = Projects.objects.create(organization=cls.organization, name='Apollo')
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def async_get(self, url, etag=None):
+        """GET through the ASGI handler, which serves the reads with the async views"""
+        headers = {'If-None-Match': etag} if etag else {}
+        return async_to_sync(self.async_client.get)(url, headers=headers)
+
+    def create_tasks(self, count, project=None):
+        tasks = []
+        for i in range(count):
+            task = Tasks.objects.create(project=project or self.project, title=f'Task {i}')
+            task.assignees.add(self.manager, self.member)
+            tasks.append(task)
+        return tasks
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}, CELERY_TASK_ALWAYS_EAGER=True
+)
+class NestedSerializerQueryCountTests(CoreTestMixin, TestCase):
+    """
+    Nested task/project reads must cost a fixed number of queries regardless of the row count.
+    """
+
+    def test_task_serializer_query_count_is_constant(self):
+        self.create_tasks(25)
+        queryset = ListCreateTasks.queryset.all()
+
+        # tasks (+ project + organization joined), assignees, organization users
+        with self.assertNumQueries(3):
+            data = TaskSerializer(queryset, many=True).data
+
+        self.assertEqual(len(data), 25)
+        self.assertEqual(len(data[0]['assignees']), 2)
+        self.assertEqual(len(data[0]['project_details']['organization_details']['user_details']), 2)
+
+    def test_project_serializer_query_count_is_constant(self):
+        for i in range(10):
+            Projects.objects.create(organization=self.organization, name=f'Project {i}')
+        queryset = ListCreateProjects.queryset.all()
+
+        # projects (+ organization joined), organization users
+        with self.assertNumQueries(2):
+            data = ProjectSerilizer(queryset, many=True).data
+
+        self.assertEqual(len(data), 11)
+
+    def test_task_list_endpoint_query_count_does_not_grow(self):
+        self.client.force_login(self.manager)
+        url = reverse('list-create-tasks') + '?limit=100'
+
+        self.create_tasks(2)
+        self.client.get(url)  # warm the membership cache
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tasks(1)  # and move past the cached list
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tasks(20)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 23)
+
+        self.assertEqual(len(small), len(large))
+
+
+
+class TaskCursorPaginationTests(CoreTestMixin, TestCase):
+
+    def test_cursor_walks_every_task_once_in_keyset_order(self):
+        self.create_tasks(7)
+        self.client.force_login(self.manager)
+
+        seen = []
+        url = reverse('list-create-tasks') + '?cursor=&limit=3'
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(task['id'] for task in body['results'])
+            url = body['next']
+
+        expected = list(Tasks.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_preceding_page(self):
+        self.create_tasks(5)
+        self.client.force_login(self.manager)
+
+        first = self.client.get(reverse('list-create-tasks') + '?cursor=&limit=2').json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+
+        self.assertIsNone(first['previous'])
+        self.assertEqual([t['id'] for t in back['results']], [t['id'] for t in first['results']])
+
+    def test_invalid_cursor_is_rejected(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(reverse('list-create-tasks') + '?cursor=cD1nYXJiYWdl')
+        self.assertEqual(response.status_code, 404)
+
+        for position in ('2024-13-45T00:00:00|1', '2024-01-01T00:00:00|abc'):
+            cursor = base64.b64encode(urlencode({'p': position}).encode()).decode()
+            response = self.client.get(reverse('list-create-tasks'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, position)
+
+
+class OrganizationScopeTests(CoreTestMixin, TestCase):
+
+    def test_lists_only_contain_the_users_organizations(self):
+        other_org = Organization.objects.create(name='Other')
+        other_project = Projects.objects.create(organization=other_org, name='Hidden')
+        self.create_tasks(2)
+        self.create_tasks(3, project=other_project)
+        self.client.force_login(self.manager)
+
+        tasks = self.client.get(reverse('list-create-tasks')).json()
+        projects = self.client.get(reverse('list-create-projects')).json()
+
+        self.assertEqual(tasks['count'], 2)
+        self.assertEqual([p['id'] for p in projects], [self.project.id])
+
+    def test_organization_ids_are_resolved_once_per_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.manager
+
+        with self.assertNumQueries(1):
+            first = get_user_organization_ids(request)
+            second = get_user_organization_ids(request)
+
+        self.assertEqual(first, {self.organization.id})
+        self.assertIs(first, second)
+
+
+class OrganizationMembershipCacheTests(CoreTestMixin, TestCase):
+
+    def test_membership_is_served_from_cache(self):
+        get_cached_organization_ids(self.member)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_organization_ids(self.member), {self.organization.id})
+
+    def test_adding_and_removing_users_invalidates(self):
+        other_org = Organization.objects.create(name='Other')
+        get_cached_organization_ids(self.member)
+
+        other_org.users.add(self.member)
+        self.assertEqual(get_cached_organization_ids(self.member), {self.organization.id, other_org.id})
+
+        self.member.belonging_organization.remove(self.organization)
+        self.assertEqual(get_cached_organization_ids(self.member), {other_org.id})
+
+        other_org.users.clear()
+        self.assertEqual(get_cached_organization_ids(self.member), set())
+
+    def test_membership_cached_during_the_transaction_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.users.remove(self.member)
+            # a concurrent request re-caching the old membership before the commit
+            cache.set(ORGANIZATION_MEMBERSHIP_CACHE_KEY.format(user_id=self.member.pk), frozenset([self.organization.id]))
+        self.assertEqual(get_cached_organization_ids(self.member), set())
+
+    def test_deleting_organization_invalidates(self):
+        get_cached_organization_ids(self.member)
+        self.organization.delete()
+        self.assertEqual(get_cached_organization_ids(self.member), set())
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}, CELERY_TASK_ALWAYS_EAGER=True
+)
+class BulkCreateUpdateTasksTests(CoreTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.manager)
+        self.url = reverse('bulk-create-update-tasks')
+
+    def test_bulk_create_with_assignees_and_history(self):
+        payload = [
+            {'project': self.project.id, 'title': f'Imported {i}', 'assignees': [self.member.id]}
+            for i in range(20)
+        ]
+
+        response = self.client.post(self.url, payload, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.json()], ['created'] * 20)
+        ids = [r['id'] for r in response.json()]
+        self.assertEqual(Tasks.objects.filter(id__in=ids, assignees=self.member).count(), 20)
+        self.assertEqual(Tasks.history.filter(id__in=ids, history_type='+').count(), 20)
+        self.assertTrue(all(task.slug for task in Tasks.objects.filter(id__in=ids)))
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def run(count):
+            payload = [{'project': self.project.id, 'title': f'T {i}', 'assignees': [self.member.id]} for i in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.url, payload, content_type='application/json')
+            return len(queries)
+
+        run(1)  # warm the membership cache
+        self.assertEqual(run(2), run(50))
+
+    def test_updates_notify_and_report_per_item_errors(self):
+        task = self.create_tasks(1)[0]
+        other_org = Organization.objects.create(name='Other')
+        hidden = Projects.objects.create(organization=other_org, name='Hidden')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.url, [
+                {'id': task.id, 'status': 'DONE'},
+                {'project': hidden.id, 'title': 'Not mine'},
+                {'project': self.project.id},
+            ], content_type='application/json')
+        # notifications go through the outbox, relayed once the batch commits
+        self.assertTrue(NotificationOutbox.objects.filter(task=task, notification_type='task_completed').exists())
+        self.assertFalse(Notification.objects.filter(task=task).exists())
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        self.assertEqual([r['status'] for r in body], ['updated', 'error', 'error'])
+        self.assertIn('project', body[1]['errors'])
+        self.assertIn('title', body[2]['errors'])
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'DONE')
+        self.assertEqual(task.assignees.count(), 2)  # untouched, not part of the update
+        self.assertEqual(Tasks.history.filter(id=task.id, history_type='~').count(), 1)
+        self.assertEqual(
+            list(Notification.objects.filter(task=task, notification_type='task_completed').values_list('recipient_id', flat=True)),
+            [self.member.id]
+        )
+
+
+    def test_events_match_single_task_writes(self):
+        task = self.create_tasks(1)[0]
+        NotificationOutbox.objects.all().delete()
+        response = self.client.post(self.url, [
+            {'id': task.id, 'status': 'IN_PROGRESS'},
+            {'project': self.project.id, 'title': 'Assigned', 'assignees': [self.member.id]},
+            {'project': self.project.id, 'title': 'Unassigned'},
+        ], content_type='application/json')
+        created, unassigned = response.json()[1]['id'], response.json()[2]['id']
+
+        events = set(NotificationOutbox.objects.values_list('task_id', 'notification_type'))
+        self.assertEqual(events, {(task.id, 'task_status_updated'), (created, 'task_assigned')})
+        self.assertFalse(NotificationOutbox.objects.filter(task_id=unassigned).exists())
+
+    def test_updates_are_object_permission_checked(self):
+        assigned, unassigned = self.create_tasks(2)
+        unassigned.assignees.remove(self.manager)
+        self.assertEqual(self.client.put(
+            reverse('retrieve-update-delete-tasks', args=[unassigned.pk]), {'title': 'Mine now'}, content_type='application/json'
+        ).status_code, 403)
+
+        response = self.client.post(self.url, [
+            {'id': assigned.id, 'title': 'Allowed'},
+            {'id': unassigned.id, 'title': 'Mine now'},
+        ], content_type='application/json')
+
+        self.assertEqual(response.status_code, 207)
+        allowed, refused = response.json()
+        self.assertEqual(allowed['status'], 'updated')
+        self.assertEqual((refused['status'], refused['status_code']), ('error', 403))
+        self.assertEqual(Tasks.objects.get(pk=unassigned.pk).title, 'Task 1')
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ProjectTaskCounterTests(CoreTestMixin, TestCase):
+
+    def counts(self):
+        counter = ProjectTaskCounter.objects.get(project=self.project)
+        return counter.todo_count, counter.in_progress_count, counter.done_count
+
+    def test_counters_follow_task_lifecycle(self):
+        first, second = self.create_tasks(2)
+        self.assertEqual(self.counts(), (2, 0, 0))
+
+        task = Tasks.objects.get(pk=first.pk)
+        task.status = 'DONE'
+        task.save()
+        self.assertEqual(self.counts(), (1, 0, 1))
+
+        Tasks.objects.get(pk=second.pk).delete()
+        self.assertEqual(self.counts(), (0, 0, 1))
+
+        project = Projects.objects.get(pk=self.project.pk)
+        self.assertEqual((project.task_count, project.completed_tasks_count, project.completion_rate), (1, 1, 100))
+
+    def test_bulk_endpoint_updates_counters(self):
+        task = self.create_tasks(1)[0]
+        self.client.force_login(self.manager)
+        self.client.post(reverse('bulk-create-update-tasks'), [
+            {'id': task.id, 'status': 'IN_PROGRESS'},
+            {'project': self.project.id, 'title': 'New', 'status': 'DONE'},
+        ], content_type='application/json')
+
+        self.assertEqual(self.counts(), (0, 1, 1))
+
+    def test_rebuild_command_recounts(self):
+        self.create_tasks(3)
+        Tasks.objects.filter(project=self.project).update(status='DONE')  # bypasses the signals
+        ProjectTaskCounter.objects.all().delete()
+
+        call_command('rebuild_task_counters', stdout=StringIO())
+
+        self.assertEqual(self.counts(), (0, 0, 3))
+
+    def test_stats_endpoint_reads_counters(self):
+        self.create_tasks(4)
+        self.client.force_login(self.manager)
+        url = reverse('retrieve-project-stats', kwargs={'pk': self.project.pk})
+        self.client.get(url)  # warm the membership cache
+
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get(url).json()
+
+        self.assertEqual((body['total'], body['todo_count'], body['completion_rate']), (4, 4, 0))
+        self.assertFalse([q for q in queries if 'core_tasks' in q['sql']])
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class TaskSearchTests(CoreTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.manager)
+        self.url = reverse('search-tasks')
+
+    def search(self, query):
+        return [task['id'] for task in self.client.get(self.url, {'q': query}).json()['results']]
+
+    def test_results_are_ranked_and_kept_in_sync(self):
+        in_description = Tasks.objects.create(project=self.project, title='Cleanup', description='fix the login redirect')
+        in_title = Tasks.objects.create(project=self.project, title='Login page broken')
+        Tasks.objects.create(project=self.project, title='Unrelated')
+
+        self.assertEqual(self.search('login'), [in_title.id, in_description.id])
+
+        in_title.title = 'Signup page broken'
+        in_title.save()
+        self.assertEqual(self.search('login'), [in_description.id])
+
+        in_description.delete()
+        self.assertEqual(self.search('login'), [])
+
+    def test_prefix_match_and_operator_input_is_inert(self):
+        task = Tasks.objects.create(project=self.project, title='Database migration')
+        self.assertEqual(self.search('datab'), [task.id])
+        self.assertEqual(self.search('"migration*)'), [task.id])
+
+    def test_results_are_scoped_to_the_users_organizations(self):
+        other_org = Organization.objects.create(name='Other')
+        hidden = Projects.objects.create(organization=other_org, name='Hidden')
+        Tasks.objects.create(project=hidden, title='Secret roadmap')
+        self.assertEqual(self.search('roadmap'), [])
+
+    def test_bulk_created_tasks_are_indexed_and_rebuild_restores_index(self):
+        self.client.post(reverse('bulk-create-update-tasks'), [
+            {'project': self.project.id, 'title': 'Imported invoice export'}
+        ], content_type='application/json')
+        self.assertEqual(len(self.search('invoice')), 1)
+
+        get_search_backend().rebuild([])
+        self.assertEqual(self.search('invoice'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('invoice')), 1)
+
+
+class TaskFilterIndexTests(CoreTestMixin, TestCase):
+    """
+    The common TaskFilters combinations, applied on the list view queryset, must be served by the composite indexes.
+    """
+
+    def filtered_queryset(self, params):
+        request = RequestFactory().get('/', params)
+        request.user = self.manager
+        queryset = ListCreateTasks.queryset.filter(
+            project__organization_id__in=get_user_organization_ids(request)
+        )
+        return TaskFilters(params, queryset=queryset, request=request).qs
+
+    def assertUsesIndex(self, params, index_name):
+        plan = self.filtered_queryset(params).explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_status_and_due_date_use_project_status_index(self):
+        self.assertUsesIndex({'status': 'TODO'}, 'task_project_status_due_idx')
+        self.assertUsesIndex({'status': 'TODO,IN_PROGRESS'}, 'task_project_status_due_idx')
+        self.assertUsesIndex(
+            {'status': 'TODO', 'due_date_after': '2025-01-01', 'due_date_before': '2025-12-31'},
+            'task_project_status_due_idx'
+        )
+
+    def test_priority_uses_project_priority_index(self):
+        self.assertUsesIndex({'priority': 'HIGH'}, 'task_project_priority_idx')
+
+    def test_filters_are_exact(self):
+        self.create_tasks(1)
+        self.assertEqual(self.filtered_queryset({'status': 'TODO'}).count(), 1)
+        self.assertEqual(self.filtered_queryset({'status': 'DONE,IN_PROGRESS'}).count(), 0)
+        self.assertFalse(TaskFilters({'status': 'todo'}, queryset=Tasks.objects.all()).is_valid())
+
+
+class ExportTasksTests(CoreTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.manager)
+        self.url = reverse('export-tasks')
+
+    def test_ndjson_export_streams_scoped_rows(self):
+        tasks = self.create_tasks(3)
+        other_org = Organization.objects.create(name='Other')
+        Tasks.objects.create(project=Projects.objects.create(organization=other_org, name='Hidden'), title='Hidden')
+
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [task.id for task in tasks])
+        self.assertEqual(sorted(rows[0]['assignees']), sorted([self.manager.id, self.member.id]))
+
+    def test_csv_export_applies_filters(self):
+        done = self.create_tasks(2)[0]
+        Tasks.objects.filter(pk=done.pk).update(status='DONE')
+
+        response = self.client.get(self.url, {'output': 'csv', 'status': 'DONE'})
+
+        lines = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(lines[0][0], 'id')
+        self.assertEqual([line[0] for line in lines[1:]], [str(done.id)])
+
+    def test_chunks_match_between_sync_and_async_iteration(self):
+        self.create_tasks(5)
+        exporter = TaskExporter(Tasks.objects.all(), chunk_size=2)
+
+        async def collect():
+            return [chunk async for chunk in exporter.aiter_chunks()]
+
+        sync_chunks = list(exporter.iter_chunks())
+        self.assertEqual(len(sync_chunks), 3)
+        self.assertEqual(async_to_sync(collect)(), sync_chunks)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        tasks = await sync_to_async(self.create_tasks)(2)
+        await self.async_client.aforce_login(self.manager)
+
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual([json.loads(line)['id'] for line in body.decode().splitlines()], [task.id for task in tasks])
+
+    def test_unknown_output_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+
+
+class ImportTasksCommandTests(CoreTestMixin, TestCase):
+
+    def run_import(self, content, suffix, *args):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_tasks', handle.name, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_import_backfills_links_history_counters_and_index(self):
+        content = (
+            'title,project,status,assignees\n'
+            f'Imported one,{self.project.slug},DONE,{self.member.email}\n'
+            f'Imported two,{self.project.id},TODO,"{self.member.id},{self.manager.email}"\n'
+            'Orphan,999999,TODO,\n'
+            f'Bad status,{self.project.id},NOPE,\n'
+        )
+
+        stdout, stderr = self.run_import(content, '.csv', '--batch-size', '2', '--user', self.manager.email)
+
+        self.assertIn('Imported 2 tasks, rejected 2', stdout)
+        self.assertIn('line 4: unknown project', stderr)
+        self.assertIn('line 5:', stderr)
+        two = Tasks.objects.get(title='Imported two')
+        self.assertEqual(set(two.assignees.values_list('id', flat=True)), {self.member.id, self.manager.id})
+        self.assertEqual(Tasks.history.filter(title__startswith='Imported', history_user=self.manager).count(), 2)
+        self.assertEqual(
+            set(Tasks.history.get(id=two.id).assignees.values_list('baseuser_id', flat=True)), {self.member.id, self.manager.id}
+        )
+        counter = ProjectTaskCounter.objects.get(project=self.project)
+        self.assertEqual((counter.todo_count, counter.done_count), (1, 1))
+        self.assertEqual(len(get_search_backend().search('imported', {self.organization.id})), 2)
+
+    def test_ndjson_export_round_trips(self):
+        self.create_tasks(3)
+        self.client.force_login(self.manager)
+        exported = b''.join(self.client.get(reverse('export-tasks')).streaming_content).decode()
+
+        stdout, _ = self.run_import(exported + '{not json\n', '.ndjson')
+
+        self.assertIn('Imported 3 tasks, rejected 1', stdout)
+        self.assertEqual(Tasks.objects.filter(title='Task 0').count(), 2)
+        self.assertEqual(Tasks.objects.filter(title='Task 0').last().assignees.count(), 2)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ConditionalGetTests(CoreTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.manager)
+
+    def test_unchanged_task_list_answers_304_without_serializing(self):
+        self.create_tasks(3)
+        url = reverse('list-create-tasks')
+        first = self.async_get(url)
+        self.assertTrue(first.has_header('Last-Modified'))
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.async_get(url, etag=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertFalse([q for q in queries if 'core_tasks_assignees' in q['sql']])
+
+    def test_etag_changes_on_update_delete_and_query(self):
+        tasks = self.create_tasks(2)
+        url = reverse('list-create-tasks')
+        etag = self.async_get(url)['ETag']
+
+        self.assertEqual(self.async_get(url + '?status=DONE', etag=etag).status_code, 200)
+
+        tasks[0].delete()
+        response = self.async_get(url, etag=etag)
+        self.assertEqual(response.status_code, 200)
+
+        task = Tasks.objects.get(pk=tasks[1].pk)
+        task.title = 'Renamed'
+        task.save()
+        self.assertEqual(self.async_get(url, etag=response['ETag']).status_code, 200)
+
+    def test_project_list_answers_304(self):
+        url = reverse('list-create-projects')
+        etag = self.async_get(url)['ETag']
+        self.assertEqual(self.async_get(url, etag=etag).status_code, 304)
+
+        Projects.objects.create(organization=self.organization, name='Another')
+        self.assertEqual(self.async_get(url, etag=etag).status_code, 200)
+
+    def test_etag_changes_when_organization_members_change(self):
+        url = reverse('list-create-projects')
+        etag = self.async_get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.users.add(BaseUser.objects.create_user(
+                email='new@example.com', first_name='New', last_name='User', user_type=UserTypeChoices.MEMBER
+            ))
+
+        self.assertEqual(self.async_get(url, etag=etag).status_code, 200)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class VersionedListCacheTests(CoreTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.manager)
+
+    def test_cached_task_list_skips_serialization_queries(self):
+        self.create_tasks(3)
+        url = reverse('list-create-tasks')
+        first = self.async_get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.async_get(url)
+
+        self.assertEqual(second.json(), first.json())
+        self.assertFalse([q for q in queries if 'core_tasks_assignees' in q['sql']])
+
+    def test_task_write_moves_organization_version(self):
+        tasks = self.create_tasks(2)
+        url = reverse('list-create-tasks')
+        self.async_get(url)
+
+        versions = get_organization_versions([self.organization.id])
+        task = Tasks.objects.get(pk=tasks[0].pk)
+        task.title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+            # readers must not cache pre-commit rows under the new version
+            self.assertEqual(get_organization_versions([self.organization.id]), versions)
+
+        titles = {item['title'] for item in self.async_get(url).json()['results']}
+        self.assertIn('Renamed', titles)
+
+    def test_project_and_member_changes_refresh_project_list(self):
+        url = reverse('list-create-projects')
+        self.async_get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Projects.objects.create(organization=self.organization, name='Zeus')
+        self.assertIn('Zeus', {item['name'] for item in self.async_get(url).json()})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.users.remove(self.member)
+        members = self.async_get(url).json()[0]['organization_details']['user_details']
+        self.assertEqual([user['email'] for user in members], [self.manager.email])
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ChunkedAttachmentUploadTests(CoreTestMixin, TestCase):
+    content = b'0123456789' * 10
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.client.force_login(self.manager)
+        self.task = self.create_tasks(1)[0]
+
+    def start(self, **extra):
+        response = self.client.post(
+            reverse('list-create-task-attachments', args=[self.task.pk]),
+            {'filename': 'notes.txt', 'size': len(self.content), **extra}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put_chunk(self, upload_id, start, end):
+        return self.client.put(
+            reverse('task-attachment-upload', args=[upload_id]), self.content[start:end + 1],
+            content_type='application/octet-stream', HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.content)}'
+        )
+
+    def upload(self):
+        upload = self.start()
+        self.assertEqual(self.put_chunk(upload['id'], 0, 39).json()['offset'], 40)
+        response = self.put_chunk(upload['id'], 40, 99)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_chunks_are_assembled_into_a_content_addressed_blob(self):
+        events = NotificationOutbox.objects.count()
+        versions = get_organization_versions([self.organization.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            upload = self.upload()
+
+        self.assertEqual(upload['status'], 'COMPLETE')
+        self.assertEqual(upload['sha256'], hashlib.sha256(self.content).hexdigest())
+        blob = AttachmentBlob.objects.get()
+        with blob.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.attachments.name, blob.file.name)
+        # no task save receivers - nothing to notify - but cached task lists move on
+        self.assertEqual(NotificationOutbox.objects.count(), events)
+        self.assertNotEqual(get_organization_versions([self.organization.id]), versions)
+        self.assertFalse(os.listdir(os.path.join(self.media_root, 'attachments', 'uploads')))
+
+    def test_identical_content_is_stored_once(self):
+        self.upload()
+        self.upload()
+        instant = self.start(sha256=hashlib.sha256(self.content).hexdigest())
+
+        self.assertEqual(instant['status'], 'COMPLETE')
+        self.assertEqual(AttachmentBlob.objects.count(), 1)
+        self.assertEqual(TaskAttachment.objects.filter(blob__isnull=False).count(), 3)
+
+    def test_known_hash_of_another_organization_still_requires_the_upload(self):
+        self.upload()
+        outsider = BaseUser.objects.create_user(
+            email='outsider@example.com', first_name='Out', last_name='Sider', user_type=UserTypeChoices.MANAGER
+        )
+        organization = Organization.objects.create(name='Globex')
+        organization.users.add(outsider)
+        self.task = Tasks.objects.create(project=Projects.objects.create(organization=organization, name='Hermes'), title='Other')
+        self.task.assignees.add(outsider)
+        self.client.force_login(outsider)
+
+        upload = self.start(sha256=hashlib.sha256(self.content).hexdigest())
+        self.assertEqual((upload['status'], upload['offset']), ('UPLOADING', 0))
+        self.assertIsNone(TaskAttachment.objects.get(pk=upload['id']).blob)
+
+        # the uploaded bytes are still stored once
+        self.assertEqual(self.put_chunk(upload['id'], 0, 99).json()['status'], 'COMPLETE')
+        self.assertEqual(AttachmentBlob.objects.count(), 1)
+
+    def test_attachments_of_unassigned_tasks_are_refused(self):
+        upload = self.start()
+        self.task.assignees.remove(self.manager)
+
+        self.assertEqual(self.client.get(reverse('list-create-task-attachments', args=[self.task.pk])).status_code, 403)
+        self.assertEqual(self.client.post(
+            reverse('list-create-task-attachments', args=[self.task.pk]),
+            {'filename': 'notes.txt', 'size': len(self.content)}, content_type='application/json'
+        ).status_code, 403)
+        self.assertEqual(self.client.get(reverse('task-attachment-upload', args=[upload['id']])).status_code, 403)
+        self.assertEqual(self.put_chunk(upload['id'], 0, 39).status_code, 403)
+        self.assertEqual(TaskAttachment.objects.get(pk=upload['id']).offset, 0)
+
+    def test_resume_reports_the_offset_to_continue_from(self):
+        upload = self.start()
+        self.put_chunk(upload['id'], 0, 39)
+
+        response = self.put_chunk(upload['id'], 20, 59)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 40)
+
+        state = self.client.get(reverse('task-attachment-upload', args=[upload['id']])).json()
+        self.assertEqual((state['offset'], state['status']), (40, 'UPLOADING'))
+        self.assertEqual(self.put_chunk(upload['id'], 40, 99).json()['status'], 'COMPLETE')
+
+    def test_chunk_racing_another_request_is_rejected(self):
+        upload = self.start()
+
+        class RacedBody:
+            # another request lands the same range while this body is still being received
+            def __init__(self, content):
+                self.content, self.raced = content, False
+
+            def read(self, size):
+                if not self.raced:
+                    self.raced = True
+                    TaskAttachment.objects.filter(pk=upload['id']).update(offset=40)
+                data, self.content = self.content[:size], self.content[size:]
+                return data
+
+        with self.assertRaises(UploadError) as raised:
+            chunked_upload_service.write_chunk(upload['id'], 0, RacedBody(self.content[:40]), 40)
+        self.assertEqual((raised.exception.status, raised.exception.offset), (409, 40))
+        self.assertEqual(TaskAttachment.objects.get(pk=upload['id']).offset, 40)
+
+    def test_checksum_mismatch_restarts_upload(self):
+        upload = self.start(sha256='0' * 64)
+        self.put_chunk(upload['id'], 0, 49)
+        response = self.put_chunk(upload['id'], 50, 99)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['offset'], 0)
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+    def test_download_supports_ranges(self):
+        upload = self.upload()
+        url = reverse('download-task-attachment', args=[upload['id']])
+
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn("filename*=UTF-8''notes.txt", response['Content-Disposition'])
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(partial.streaming_content), self.content[10:20])
+
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-5').streaming_content), self.content[-5:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=100-').status_code, 416)
+
+    async def test_download_streams_asynchronously_under_asgi(self):
+        upload = await sync_to_async(self.upload)()
+        url = reverse('download-task-attachment', args=[upload['id']])
+        await self.async_client.aforce_login(self.manager)
+
+        response = await self.async_client.get(url)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), self.content)
+
+        partial = await self.async_client.get(url, headers={'Range': 'bytes=10-19'})
+        self.assertTrue(partial.is_async)
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join([chunk async for chunk in partial.streaming_content]), self.content[10:20])
+
+    def test_download_is_handed_to_the_front_server(self):
+        upload = self.upload()
+        url = reverse('download-task-attachment', args=[upload['id']])
+
+        with override_settings(ATTACHMENT_DOWNLOAD_BACKEND='x-accel-redirect'):
+            response = self.client.get(url)
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + blob.file.name)
+        self.assertEqual(response.content, b'')
+
+        self.client.force_login(BaseUser.objects.create_user(
+            email='outsider@example.com', first_name='Out', last_name='Sider', user_type=UserTypeChoices.MANAGER
+        ))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_download_requires_access_to_the_task(self):
+        upload = self.upload()
+        url = reverse('download-task-attachment', args=[upload['id']])
+        self.task.assignees.remove(self.manager)
+
+        with override_settings(ATTACHMENT_DOWNLOAD_BACKEND='x-accel-redirect'):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.has_header('X-Accel-Redirect'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.async_client.force_login(self.manager)
+        self.assertEqual(async_to_sync(self.async_client.get)(url).status_code, 403)
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}, CELERY_TASK_ALWAYS_EAGER=True
+)
+class TaskActivityTests(CoreTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = Tasks.objects.create(project=self.project, title='Timeline', status='TODO', priority='HIGH')
+            self.task.assignees.add(self.member)
+            self.task.status = 'IN_PROGRESS'
+            self.task.save()
+            self.task.title = 'Only the title'
+            self.task.save()
+            self.task.priority = 'LOW'
+            self.task.save()
+            self.task.assignees.remove(self.member)
+            self.task.assignees.add(self.manager)
+
+    def test_timeline_pages_through_field_diffs(self):
+        url = reverse('list-task-activity', args=[self.task.pk])
+        first = self.client.get(url, {'limit': 3}).json()
+
+        self.assertEqual(first['results'][0]['changes'], [
+            {'field': 'assignees', 'added': [{'id': self.manager.id, 'email': self.manager.email}], 'removed': []}
+        ])
+        self.assertEqual(first['results'][1]['changes'][0]['removed'], [{'id': self.member.id, 'email': self.member.email}])
+        self.assertEqual(first['results'][2]['changes'], [{'field': 'priority', 'old': 'HIGH', 'new': 'LOW'}])
+
+        # the title-only save is not part of the timeline
+        second = self.client.get(first['next']).json()
+        self.assertEqual(second['results'][0]['changes'], [{'field': 'status', 'old': 'TODO', 'new': 'IN_PROGRESS'}])
+        self.assertEqual(second['results'][1]['changes'][0]['field'], 'assignees')
+
+        last = self.client.get(second['next']).json()
+        self.assertIsNone(last['next'])
+        self.assertEqual([entry['action'] for entry in last['results']], ['created'])
+        self.assertEqual({change['field'] for change in last['results'][0]['changes']}, {'status', 'priority', 'due_date'})
+
+    def test_bulk_writes_snapshot_assignees(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('bulk-create-update-tasks'), [
+                {'id': self.task.id, 'status': 'DONE'},
+                {'project': self.project.id, 'title': 'Bulk', 'assignees': [self.manager.id]},
+            ], content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        url = reverse('list-task-activity', args=[self.task.pk])
+        self.assertEqual(self.client.get(url).json()['results'][0]['changes'], [
+            {'field': 'status', 'old': 'IN_PROGRESS', 'new': 'DONE'}
+        ])
+        created = self.client.get(reverse('list-task-activity', args=[response.json()[1]['id']])).json()
+        self.assertEqual(created['results'][0]['changes'][-1]['added'], [{'id': self.manager.id, 'email': self.manager.email}])
+
+    def test_timeline_is_object_permission_checked(self):
+        url = reverse('list-task-activity', args=[self.task.pk])
+        self.task.assignees.remove(self.manager)
+
+        self.assertEqual(self.client.get(reverse('retrieve-update-delete-tasks', args=[self.task.pk])).status_code, 403)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_page_query_count_does_not_depend_on_limit(self):
+        url = reverse('list-task-activity', args=[self.task.pk])
+        self.client.get(url, {'limit': 1})  # warm the membership cache
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {'limit': 1})
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(url, {'limit': 50})
+        self.assertEqual(len(small), len(large))
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class AsyncViewTests(CoreTestMixin, TestCase):
+
+    async def test_async_list_and_retrieve(self):
+        tasks = await sync_to_async(self.create_tasks)(3)
+        await self.async_client.aforce_login(self.manager)
+
+        response = await self.async_client.get(reverse('list-create-tasks'), {'status': 'TODO', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(len(response.json()['results']), 2)
+        not_modified = await self.async_client.get(
+            reverse('list-create-tasks'), {'status': 'TODO', 'limit': 2}, headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+        detail = await self.async_client.get(reverse('retrieve-update-delete-tasks', args=[tasks[0].pk]))
+        self.assertEqual(detail.json()['id'], tasks[0].pk)
+        projects = await self.async_client.get(reverse('list-create-projects'))
+        self.assertEqual([project['name'] for project in projects.json()], ['Apollo'])
+
+    async def test_writes_still_go_to_the_sync_views(self):
+        await self.async_client.aforce_login(self.manager)
+        response = await self.async_client.post(reverse('list-create-projects'), {
+            'name': 'Hermes', 'description': '', 'organization': self.organization.pk, 'status': 'ACTIVE'
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+    async def test_basic_auth_and_anonymous_requests(self):
+        url = reverse('list-create-projects')
+        self.assertEqual((await self.async_client.get(url)).status_code, 403)
+
+        credentials = base64.b64encode(b'manager@example.com:secret-pass-123').decode()
+        response = await self.async_client.get(url, headers={'Authorization': f'Basic {credentials}'})
+        self.assertEqual(response.status_code, 200)
+
+    async def test_current_user_is_isolated_per_request(self):
+        seen = {}
+
+        async def view(request):
+            await asyncio.sleep(0)  # let the other request run in between
+            seen[request.user.email] = get_current_user()
+            return HttpResponse()
+
+        middleware = CurrentUserMiddleware(view)
+        requests = []
+        for user in (self.manager, self.member):
+            request = RequestFactory().get('/')
+            request.auser = partial(sync_to_async(lambda user: user), user)
+            requests.append(middleware(request))
+        await asyncio.gather(*requests)
+
+        self.assertEqual(seen, {self.manager.email: self.manager, self.member.email: self.member})
+        self.assertIsNone(get_current_user())
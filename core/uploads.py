@@ -0,0 +1,156 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from common.versions import bump_organization_versions
+from .models import AttachmentBlob, TaskAttachment, Tasks
+
+
+class UploadError(Exception):
+    """Rejected chunk / upload, `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class ChunkedUploadService:
+    """
+    Resumable, chunked task attachment uploads.
+    Chunks are streamed from the request body straight into a part file at their offset - never held in memory.
+    The finished file is hashed and stored once per SHA-256. A hash given up front skips the upload only when that
+    content is already attached to a task of the caller's organizations - a client sent hash proves nothing, any
+    other content is uploaded and deduplicated on the hash computed here.
+    """
+    read_size = 64 * 1024
+
+    def start(self, task, filename, size, user=None, sha256='', content_type='', organization_ids=()):
+        if size < 0 or size > settings.ATTACHMENT_MAX_SIZE:
+            raise UploadError(f"size must be between 0 and {settings.ATTACHMENT_MAX_SIZE} bytes.")
+
+        attachment = TaskAttachment(
+            task=task, filename=os.path.basename(filename), size=size, sha256=sha256.lower(),
+            content_type=content_type, created_by=user
+        )
+        blob = None
+        if sha256 and organization_ids:
+            blob = AttachmentBlob.objects.filter(
+                sha256=attachment.sha256, size=size, attachments__task__project__organization_id__in=organization_ids
+            ).first()
+        if blob is not None:
+            # content already stored - nothing to upload
+            attachment.save()
+            self._complete(attachment, blob)
+            return attachment
+
+        attachment.save()
+        self._open_part(attachment, 'wb').close()
+        if size == 0:
+            self._finish(attachment)
+        return attachment
+
+    def write_chunk(self, attachment_id, start, stream, length):
+        """
+        Append `length` bytes read from `stream` at `start`, which must be the current offset.
+        Completes the upload once the last byte arrived. Returns the attachment.
+        The body is written outside any transaction - a slow client must not hold a write lock - and the
+        offset only moves if it is still `start`, a concurrent chunk for the same range is rejected.
+        """
+        attachment = TaskAttachment.objects.get(pk=attachment_id)
+        if attachment.status == 'COMPLETE':
+            raise UploadError("Upload already complete.", status=409, offset=attachment.offset)
+        if start != attachment.offset:
+            raise UploadError(f"Chunk must start at {attachment.offset}.", status=409, offset=attachment.offset)
+        if length <= 0 or length > settings.ATTACHMENT_CHUNK_MAX_SIZE:
+            raise UploadError(f"Chunks must be 1 to {settings.ATTACHMENT_CHUNK_MAX_SIZE} bytes.")
+        if start + length > attachment.size:
+            raise UploadError("Chunk runs past the declared size.", offset=attachment.offset)
+
+        written = 0
+        with self._open_part(attachment, 'r+b') as part:
+            # overwrite whatever an interrupted request left behind the recorded offset
+            part.seek(start)
+            while written < length:
+                data = stream.read(min(self.read_size, length - written))
+                if not data:
+                    break
+                part.write(data)
+                written += len(data)
+            part.truncate()
+        if written != length:
+            raise UploadError("Request body shorter than the chunk range.", offset=attachment.offset)
+
+        attachment.offset, attachment.updated_at = start + length, timezone.now()
+        moved = TaskAttachment.objects.filter(pk=attachment.pk, status='UPLOADING', offset=start).update(
+            offset=attachment.offset, updated_at=attachment.updated_at
+        )
+        if not moved:
+            current = TaskAttachment.objects.get(pk=attachment.pk)
+            raise UploadError(f"Chunk must start at {current.offset}.", status=409, offset=current.offset)
+
+        if attachment.offset == attachment.size:
+            self._finish(attachment)
+        return attachment
+
+    def _finish(self, attachment):
+        digest = hashlib.sha256()
+        with self._open_part(attachment, 'rb') as part:
+            for data in iter(lambda: part.read(self.read_size), b''):
+                digest.update(data)
+        sha256 = digest.hexdigest()
+
+        if attachment.sha256 and attachment.sha256 != sha256:
+            # corrupted in transit - start over
+            self._open_part(attachment, 'wb').close()
+            TaskAttachment.objects.filter(pk=attachment.pk).update(offset=0)
+            attachment.offset = 0
+            raise UploadError("Checksum mismatch, upload restarted.", offset=0)
+
+        blob = AttachmentBlob.objects.filter(sha256=sha256).first()
+        if blob is None:
+            blob = AttachmentBlob(sha256=sha256, size=attachment.size)
+            name = blob.file.field.generate_filename(blob, attachment.filename)
+            if not default_storage.exists(name):
+                os.makedirs(os.path.dirname(default_storage.path(name)), exist_ok=True)
+                os.replace(default_storage.path(attachment.part_name), default_storage.path(name))
+            blob.file.name = name
+            try:
+                with transaction.atomic():
+                    blob.save()
+            except IntegrityError:  # stored concurrently by another upload of the same content
+                blob = AttachmentBlob.objects.get(sha256=sha256)
+
+        if default_storage.exists(attachment.part_name):
+            default_storage.delete(attachment.part_name)  # duplicate content, the stored blob is kept
+        attachment.sha256 = sha256
+        self._complete(attachment, blob)
+
+    @staticmethod
+    def _complete(attachment, blob):
+        attachment.blob = blob
+        attachment.offset = attachment.size
+        attachment.status = 'COMPLETE'
+        attachment.save(update_fields=['blob', 'offset', 'status', 'sha256', 'updated_at'])
+
+        # latest attachment is also exposed through the task's `attachments` field - written with update() as
+        # the Tasks save receivers (notifications, counters, search index) have nothing to do for it
+        task = attachment.task
+        task.attachments.name = blob.file.name
+        task.updated_at = timezone.now()
+        Tasks.objects.filter(pk=task.pk).update(attachments=task.attachments.name, updated_at=task.updated_at)
+        bump_organization_versions([task.project.organization_id])
+
+    @staticmethod
+    def _open_part(attachment, mode):
+        path = default_storage.path(attachment.part_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(path, mode)
+
+
+# Global instance
+chunked_upload_service = ChunkedUploadService()
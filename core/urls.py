@@ -1,13 +1,29 @@
 from django.urls import path
 
-from . views import CreateOrganizations, ListCreateProjects, RetrieveUpdateDeleteProjects, ListCreateTasks, RetriveUpdateDeleteTasks
+from common.views import dispatch_by_method
+
+from . views import (
+    CreateOrganizations, ListCreateProjects, RetrieveUpdateDeleteProjects, ListProjectStats, RetrieveProjectStats,
+    ListCreateTasks, RetriveUpdateDeleteTasks, BulkCreateUpdateTasks, SearchTasks, ExportTasks,
+    ListCreateTaskAttachments, TaskAttachmentUpload, DownloadTaskAttachment, ListTaskActivity,
+    AsyncListProjects, AsyncListTasks, AsyncRetrieveTask
+)
 
 urlpatterns = [
     path('create_organizations/', CreateOrganizations.as_view(), name='list-create-organizations'),
 
-    path('projects/', ListCreateProjects.as_view(), name='list-create-projects'),
-    path('projects/<int:pk>/', RetrieveUpdateDeleteProjects.as_view(), name='retrieve-update-delete-projects'),
+    path('projects/', dispatch_by_method(AsyncListProjects.as_view(), ListCreateProjects.as_view()), name='list-create-projects'),
+    path('projects/<int:pk>/', dispatch_by_method(AsyncListProjects.as_view(), RetrieveUpdateDeleteProjects.as_view()), name='retrieve-update-delete-projects'),
+    path('projects/stats/', ListProjectStats.as_view(), name='list-project-stats'),
+    path('projects/<int:pk>/stats/', RetrieveProjectStats.as_view(), name='retrieve-project-stats'),
 
-    path('tasks/', ListCreateTasks.as_view(), name='list-create-tasks'),
-    path('tasks/<int:pk>/', RetriveUpdateDeleteTasks.as_view(), name='retrieve-update-delete-tasks'),
+    path('tasks/', dispatch_by_method(AsyncListTasks.as_view(), ListCreateTasks.as_view()), name='list-create-tasks'),
+    path('tasks/<int:pk>/', dispatch_by_method(AsyncRetrieveTask.as_view(), RetriveUpdateDeleteTasks.as_view()), name='retrieve-update-delete-tasks'),
+    path('tasks/bulk/', BulkCreateUpdateTasks.as_view(), name='bulk-create-update-tasks'),
+    path('tasks/search/', SearchTasks.as_view(), name='search-tasks'),
+    path('tasks/export/', ExportTasks.as_view(), name='export-tasks'),
+    path('tasks/<int:pk>/activity/', ListTaskActivity.as_view(), name='list-task-activity'),
+    path('tasks/<int:pk>/attachments/', ListCreateTaskAttachments.as_view(), name='list-create-task-attachments'),
+    path('attachments/<uuid:pk>/', TaskAttachmentUpload.as_view(), name='task-attachment-upload'),
+    path('attachments/<uuid:pk>/download/', DownloadTaskAttachment.as_view(), name='download-task-attachment'),
 ]
\ No newline at end of file
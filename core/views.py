@@ -1,138 +1,248 @@
-from django.contrib.sessions.models import Session
+import re
+
 from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions
-from rest_framework.authentication import BasicAuthentication, SessionAuthentication
-from rest_framework.generics import ListCreateAPIView, CreateAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework import permissions, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.generics import ListAPIView, CreateAPIView, DestroyAPIView, RetrieveAPIView, UpdateAPIView
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 
-from users.authentication import CsrfExemptSessionAuthentication
-from users.models import BaseUser
+from common.mixins import ConditionalListMixin, VersionedCacheListMixin
+from common.pagination import LimitOffsetOrCursorPagination
+from common.resolvers import aget_user_organization_ids, get_user_organization_ids
+from common.views import AsyncGenericAPIView
+from users.authentication import APITokenAuthentication, CachedBasicAuthentication, CsrfExemptSessionAuthentication
 from users.permissions import MemberPrivileges, OwnerPrivileges, ManagerPrivileges
 from .filters import TaskFilters
 
-from . models import Organization, Projects, Tasks
-from . serilizers import OrganizationSerializer, ProjectSerilizer, TaskSerializer
+from . models import Organization, Projects, ProjectTaskCounter, TaskAttachment, Tasks
+from . serilizers import (
+    OrganizationSerializer, ProjectSerilizer, TaskSerializer, ProjectTaskCounterSerializer,
+    TaskAttachmentSerializer, StartAttachmentUploadSerializer
+)
+from . activity import TaskActivity
+from . downloads import file_download_response, streaming_response
+from . exports import TaskExporter
+from . search import get_search_backend
+from . services import task_bulk_service
+from . uploads import UploadError, chunked_upload_service
 
 
 class CreateOrganizations(CreateAPIView):
     queryset = Organization.objects.all()
     serializer_class = OrganizationSerializer
-    authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication, SessionAuthentication)
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
     permission_classes = [permissions.IsAuthenticated] # object level custom permission can be used for restricting PUT and POST requests
 
-class ListCreateProjects(ListCreateAPIView):
-    queryset = Projects.objects.all()
+class ListCreateProjects(CreateAPIView):
+    """
+    Project creation, reads of the URL are served by AsyncListProjects.
+    """
+    # load organization and its users along with the projects, avoids N+1 queries in nested serializers
+    queryset = Projects.objects.select_related('organization').prefetch_related('organization__users')
     serializer_class = ProjectSerilizer
-    authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication, SessionAuthentication)
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
     permission_classes = [ManagerPrivileges, OwnerPrivileges]  # object level custom permission
 
-    def get_query_set_from_user_session(self):
+    def get_queryset(self):
         """
-        Retrieve the user from the session using the session ID.
+        Projects of the organizations the requesting user belongs to.
         """
-        sessionid = self.request.COOKIES.get('sessionid')
+        return super().get_queryset().filter(organization_id__in=get_user_organization_ids(self.request))
 
-        if sessionid:
-            try:
-                session = Session.objects.get(session_key=sessionid)
-                session_data = session.get_decoded()
-                user_id = session_data.get('_auth_user_id')
+class RetrieveUpdateDeleteProjects(ListCreateProjects):
+    """
+    Writes of projects/<pk>/, reads are served by AsyncListProjects.
+    """
 
-                if BaseUser.objects.filter(id=user_id).exists():
-                    return Projects.objects.filter(organization__users__id=user_id)
-            except Session.DoesNotExist:
-                pass  # Session does not exist
-        return None  # Return None if no user is found
+class AsyncListProjects(ConditionalListMixin, VersionedCacheListMixin, AsyncGenericAPIView):
+    """
+    GET of ListCreateProjects / RetrieveUpdateDeleteProjects on the event loop (async ORM and cache),
+    the only implementation of the project list reads.
+    """
+    queryset = ListCreateProjects.queryset
+    serializer_class = ProjectSerilizer
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [ManagerPrivileges, OwnerPrivileges]
+    list_cache_prefix = 'list_listcreateprojects'
 
-    def get(self, request, *args, **kwargs):
-        user_credentials = self.get_query_set_from_user_session()
-        serializer = self.serializer_class(user_credentials, many=True)
-        return JsonResponse(serializer.data, safe=False, status=200)
+    async def get(self, request, *args, **kwargs):
+        organization_ids = await aget_user_organization_ids(request)
+        queryset = self.get_queryset().filter(organization_id__in=organization_ids)
+        not_modified = await self.aget_not_modified_response(queryset)
+        if not_modified is not None:
+            return not_modified
 
-class RetrieveUpdateDeleteProjects(ListCreateAPIView):
-    queryset = Projects.objects.all()
-    serializer_class = ProjectSerilizer
-    authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication, SessionAuthentication)
-    permission_classes = [ManagerPrivileges, OwnerPrivileges]  # object level custom permission
+        async def build():
+            # relations are prefetched with the rows, serializing needs no further queries
+            return self.serializer_class([project async for project in queryset], many=True).data
 
-    def get_query_set_from_user_session(self):
-        """
-        Retrieve the user from the session using the session ID.
-        """
-        sessionid = self.request.COOKIES.get('sessionid')
+        data = await self.aget_cached_list_data(build)
+        return self.set_validator_headers(JsonResponse(data, safe=False, status=200))
 
-        if sessionid:
-            try:
-                session = Session.objects.get(session_key=sessionid)
-                session_data = session.get_decoded()
-                user_id = session_data.get('_auth_user_id')
+class ListProjectStats(ListAPIView):
+    """
+    Task counts by status of every project visible to the user.
+    Served from the denormalized counters - one row read per project, no COUNT over tasks.
+    """
+    queryset = ProjectTaskCounter.objects.select_related('project').order_by('project_id')
+    serializer_class = ProjectTaskCounterSerializer
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [ManagerPrivileges, OwnerPrivileges]
 
-                if BaseUser.objects.filter(id=user_id).exists():
-                    return Projects.objects.filter(organization__users__id=user_id)
-            except Session.DoesNotExist:
-                pass  # Session does not exist
-        return None  # Return None if no user is found
+    def get_queryset(self):
+        return super().get_queryset().filter(project__organization_id__in=get_user_organization_ids(self.request))
 
+class RetrieveProjectStats(RetrieveAPIView):
+    queryset = ProjectTaskCounter.objects.select_related('project')
+    serializer_class = ProjectTaskCounterSerializer
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [ManagerPrivileges, OwnerPrivileges]
 
-    def get(self, request, *args, **kwargs):
-        user_credentials = self.get_query_set_from_user_session()
-        serializer = self.serializer_class(user_credentials, many=True)
-        return JsonResponse(serializer.data, safe=False, status=200)
+    def get_object(self):
+        project = get_object_or_404(
+            Projects.objects.filter(organization_id__in=get_user_organization_ids(self.request)),
+            pk=self.kwargs['pk']
+        )
+        return project.get_task_counter()
 
-class ListCreateTasks(ListCreateAPIView):
-    queryset = Tasks.objects.all()
+class ListCreateTasks(CreateAPIView):
+    """
+    Task creation, reads of the URL are served by AsyncListTasks.
+    """
+    # load project -> organization -> users and assignees up front, avoids N+1 queries in nested serializers
+    queryset = Tasks.objects.select_related('project__organization').prefetch_related(
+        'assignees', 'project__organization__users'
+    )
     serializer_class = TaskSerializer
-    authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication, SessionAuthentication)
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
     permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]  # object level custom permission
-    filter_backends = [DjangoFilterBackend]
-    filterset_class = TaskFilters
-    pagination_class = LimitOffsetPagination
 
     def get_queryset(self):
         """
-        Retrieve the user from the session using the session ID.
+        Tasks of the organizations the requesting user belongs to.
         """
-        sessionid = self.request.COOKIES.get('sessionid')
-
-        if sessionid:
-            try:
-                session = Session.objects.get(session_key=sessionid)
-                session_data = session.get_decoded()
-                user_id = session_data.get('_auth_user_id')
-
-                if BaseUser.objects.filter(id=user_id).exists():
-                    return Tasks.objects.filter(project__organization__users__id=user_id)
-            except Session.DoesNotExist:
-                pass  # Session does not exist
-        return None  # Return None if no user is found
-
-class RetriveUpdateDeleteTasks(RetrieveUpdateDestroyAPIView):
-    queryset = Tasks.objects.all()
+        return super().get_queryset().filter(project__organization_id__in=get_user_organization_ids(self.request))
+
+class AsyncListTasks(ConditionalListMixin, VersionedCacheListMixin, AsyncGenericAPIView):
+    """
+    GET of ListCreateTasks on the event loop - filters, pagination (?cursor= switches to keyset pagination
+    on (created_at, id)), validators and cache. The only implementation of the task list reads.
+    """
+    queryset = ListCreateTasks.queryset
     serializer_class = TaskSerializer
-    authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication, SessionAuthentication)
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskFilters
+    pagination_class = LimitOffsetOrCursorPagination
+    list_cache_prefix = 'list_listcreatetasks'
+
+    async def get(self, request, *args, **kwargs):
+        organization_ids = await aget_user_organization_ids(request)
+        queryset = self.filter_queryset(self.get_queryset().filter(project__organization_id__in=organization_ids))
+        not_modified = await self.aget_not_modified_response(queryset)
+        if not_modified is not None:
+            return not_modified
+
+        async def build():
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is None:
+                return self.get_serializer([task async for task in queryset], many=True).data
+            return self.paginator.get_paginated_response(self.get_serializer(page, many=True).data).data
+
+        data = await self.aget_cached_list_data(build)
+        return self.set_validator_headers(Response(data))
+
+class SearchTasks(APIView):
+    """
+    Ranked full-text search over task titles and descriptions: ?q=<text>&limit=&offset=
+    Only tasks of the user's organizations are searched.
+    """
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or offset < 0:
+            return Response({'error': 'limit must be positive and offset not negative.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        task_ids = get_search_backend().search(query, get_user_organization_ids(request), limit=limit, offset=offset)
+        # hydrate in rank order, scoped again through the task queryset
+        tasks = ListCreateTasks.queryset.filter(
+            project__organization_id__in=get_user_organization_ids(request)
+        ).in_bulk(task_ids)
+        serializer = TaskSerializer([tasks[pk] for pk in task_ids if pk in tasks], many=True)
+        return Response({'query': query, 'results': serializer.data})
+
+class ExportTasks(APIView):
+    """
+    Streams every task visible to the user as NDJSON (default) or CSV: ?output=ndjson|csv
+    Narrow with ?organization=<id> and the TaskFilters params.
+    """
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [ManagerPrivileges, OwnerPrivileges]
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in TaskExporter.formats:
+            return Response(
+                {'error': f"output must be one of {', '.join(TaskExporter.formats)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        organization_ids = get_user_organization_ids(request)
+        organization = request.query_params.get('organization')
+        if organization:
+            organization_ids = organization_ids & {int(organization)} if organization.isdigit() else frozenset()
+
+        filterset = TaskFilters(
+            request.query_params,
+            queryset=Tasks.objects.filter(project__organization_id__in=organization_ids),
+            request=request
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        exporter = TaskExporter(filterset.qs, output)
+        response = streaming_response(
+            request, exporter.iter_chunks, exporter.aiter_chunks, content_type=exporter.content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="tasks.{output}"'
+        return response
+
+class RetriveUpdateDeleteTasks(UpdateAPIView, DestroyAPIView):
+    """
+    Task updates and deletes, reads are served by AsyncRetrieveTask.
+    """
+    queryset = Tasks.objects.select_related('project__organization').prefetch_related(
+        'assignees', 'project__organization__users'
+    )
+    serializer_class = TaskSerializer
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
     permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]  # object level custom permission
     filter_backends = [DjangoFilterBackend]
     filterset_class = TaskFilters
-    pagination_class = LimitOffsetPagination
 
-    def get_query_set_from_user_session(self):
+    def get_queryset(self):
         """
-        Retrieve the user from the session using the session ID.
+        Tasks of the organizations the requesting user belongs to.
         """
-        sessionid = self.request.COOKIES.get('sessionid')
-
-        if sessionid:
-            try:
-                session = Session.objects.get(session_key=sessionid)
-                session_data = session.get_decoded()
-                user_id = session_data.get('_auth_user_id')
-
-                if BaseUser.objects.filter(id=user_id).exists():
-                    return Tasks.objects.filter(project__organization__users__id=user_id)
-            except Session.DoesNotExist:
-                pass  # Session does not exist
-        return None  # Return None if no user is found
+        return super().get_queryset().filter(project__organization_id__in=get_user_organization_ids(self.request))
 
 
     # def get(self, request, *args, **kwargs):
@@ -140,3 +250,176 @@ class RetriveUpdateDeleteTasks(RetrieveUpdateDestroyAPIView):
     #     serializer = self.serializer_class(user_credentials, many=True)
     #     return JsonResponse(serializer.data, safe=False, status=200)
     #
+
+class AsyncRetrieveTask(AsyncGenericAPIView):
+    """
+    GET of RetriveUpdateDeleteTasks on the event loop.
+    """
+    queryset = RetriveUpdateDeleteTasks.queryset
+    serializer_class = TaskSerializer
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskFilters
+
+    async def get(self, request, *args, **kwargs):
+        organization_ids = await aget_user_organization_ids(request)
+        queryset = self.filter_queryset(self.get_queryset().filter(project__organization_id__in=organization_ids))
+        task = await aget_object_or_404(queryset, pk=self.kwargs['pk'])
+        # MemberPrivileges looks the assignee up in the database
+        await sync_to_async(self.check_object_permissions)(request, task)
+        return Response(self.get_serializer(task).data)
+
+class BulkCreateUpdateTasks(APIView):
+    """
+    Create / update many tasks in one request.
+    Body is a list of task objects, objects with an `id` update that task.
+    Responds with one result per item: created / updated with the task id, or the item errors.
+    Updates are object permission checked like PUT /core/tasks/<pk>/, refused items carry status_code 403.
+    """
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'A non-empty list of tasks is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > task_bulk_service.max_batch_size:
+            return Response(
+                {'error': f'At most {task_bulk_service.max_batch_size} tasks per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = task_bulk_service.bulk_create_update(
+            items, request.user, get_user_organization_ids(request), has_permission=self.has_task_permission
+        )
+        failed = any(result['status'] == 'error' for result in results)
+        return Response(results, status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK)
+
+    def has_task_permission(self, task):
+        try:
+            self.check_object_permissions(self.request, task)
+        except PermissionDenied:
+            return False
+        return True
+
+
+class ListCreateTaskAttachments(APIView):
+    """
+    GET - attachments of the task with their upload state.
+    POST {filename, size, sha256?, content_type?} - start a chunked upload, chunks then go to
+    PUT /core/attachments/<id>/. Content already attached in the user's organizations under the given sha256
+    completes right away.
+    """
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]
+
+    def get_task(self):
+        task = get_object_or_404(
+            Tasks.objects.select_related('project').filter(project__organization_id__in=get_user_organization_ids(self.request)),
+            pk=self.kwargs['pk']
+        )
+        self.check_object_permissions(self.request, task)
+        return task
+
+    def get(self, request, *args, **kwargs):
+        serializer = TaskAttachmentSerializer(self.get_task().task_attachments.all(), many=True)
+        return Response(serializer.data)
+
+    def post(self, request, *args, **kwargs):
+        task = self.get_task()
+        serializer = StartAttachmentUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            attachment = chunked_upload_service.start(
+                task, user=request.user, organization_ids=get_user_organization_ids(request), **serializer.validated_data
+            )
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status)
+        return Response(TaskAttachmentSerializer(attachment).data, status=status.HTTP_201_CREATED)
+
+class TaskAttachmentUpload(APIView):
+    """
+    GET - upload state, `offset` tells an interrupted client where to resume.
+    PUT - raw chunk body with `Content-Range: bytes <start>-<end>/<size>`, start must equal the offset.
+    The body is streamed to disk, it is never parsed or buffered.
+    """
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]
+
+    def get_object(self):
+        attachment = get_object_or_404(
+            TaskAttachment.objects.select_related('blob', 'task__project').filter(
+                task__project__organization_id__in=get_user_organization_ids(self.request)
+            ),
+            pk=self.kwargs['pk']
+        )
+        # same access as the task the attachment belongs to
+        self.check_object_permissions(self.request, attachment.task)
+        return attachment
+
+    def get(self, request, *args, **kwargs):
+        return Response(TaskAttachmentSerializer(self.get_object()).data)
+
+    def put(self, request, *args, **kwargs):
+        attachment = self.get_object()
+        match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)', request.headers.get('Content-Range', ''))
+        if not match:
+            return Response(
+                {'error': 'Content-Range: bytes <start>-<end>/<size> is required.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end, size = (int(value) for value in match.groups())
+        if size != attachment.size or end < start:
+            return Response({'error': 'Content-Range does not match the upload.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # read the underlying Django request, DRF's parsers would load the whole body
+            attachment = chunked_upload_service.write_chunk(attachment.pk, start, request._request, end - start + 1)
+        except UploadError as e:
+            return Response({'error': str(e), 'offset': e.offset}, status=e.status)
+        return Response(TaskAttachmentSerializer(attachment).data)
+
+class DownloadTaskAttachment(TaskAttachmentUpload):
+    """
+    Download of a completed attachment, allowed to whoever may access its task (organization and
+    assignee checks of the task detail view, done by get_object() before anything is sent).
+    The bytes are sent by the front server when ATTACHMENT_DOWNLOAD_BACKEND is set, else by a ranged FileResponse.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, *args, **kwargs):
+        attachment = self.get_object()
+        if attachment.status != 'COMPLETE':
+            return Response({'error': 'Upload not complete.'}, status=status.HTTP_409_CONFLICT)
+        return file_download_response(request, attachment.blob.file.name, attachment.filename, attachment.content_type)
+
+class ListTaskActivity(APIView):
+    """
+    Change timeline of a task (status, priority, due date, assignees), newest first.
+    Keyset paginated: ?limit=&before=<position> - `next` links to the following page.
+    """
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [MemberPrivileges, ManagerPrivileges, OwnerPrivileges]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        task = get_object_or_404(
+            Tasks.objects.filter(project__organization_id__in=get_user_organization_ids(request)), pk=self.kwargs['pk']
+        )
+        self.check_object_permissions(request, task)
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit must be positive.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            entries, next_before = TaskActivity(task, limit=limit).get_page(request.query_params.get('before') or None)
+        except ValueError:
+            return Response({'error': 'Invalid before position.'}, status=status.HTTP_400_BAD_REQUEST)
+        next_url = None
+        if next_before is not None:
+            next_url = replace_query_param(request.build_absolute_uri(), 'before', next_before)
+        return Response({'next': next_url, 'results': entries})
@@ -31,7 +31,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'common.middleware.SlidingSessionMiddleware',  # sessions with coalesced expiry refresh
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -49,7 +49,8 @@ Using cookies for session management.
 """
 CSRF_USE_SESSIONS = True
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Default session engine
+# Read through the cache, written to cache and DB (CACHES must be shared between workers - redis - in production)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 
 SESSION_COOKIE_HTTPONLY = True  # Prevents JavaScript access to the session cookie
 CSRF_COOKIE_HTTPONLY = True  # Prevents JavaScript from accessing CSRF cookie
@@ -64,7 +65,10 @@ CSRF_COOKIE_SAMESITE = 'None'  # Same for CSRF cookie handling
 # Session timeout: expire session after 30 minutes of inactivity
 SESSION_COOKIE_AGE = 30 * 60
 
-SESSION_SAVE_EVERY_REQUEST = True
+# Sliding expiry without a session write per request: common.middleware.SlidingSessionMiddleware saves
+# an unchanged session once this fraction of SESSION_COOKIE_AGE passed since its last save (every 3 minutes)
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_FRACTION = 0.1
 
 TEMPLATES = [
     {
@@ -88,7 +92,8 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
             # 'rest_framework_simplejwt.authentication.JWTAuthentication',
             'rest_framework.authentication.SessionAuthentication',
-            'rest_framework.authentication.BasicAuthentication'
+            'users.authentication.CachedBasicAuthentication',
+            'users.authentication.APITokenAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10
@@ -109,6 +114,51 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache - must be shared between workers (redis) in production so invalidations are seen everywhere
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_CACHE_URL'],
+    } if os.environ.get('REDIS_CACHE_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a user's organization membership stays cached (upper bound on staleness)
+ORGANIZATION_MEMBERSHIP_CACHE_TIMEOUT = 5 * 60
+
+# Seconds a verified Basic auth credential is trusted without re-running the password hasher
+BASIC_AUTH_CACHE_TIMEOUT = 60
+
+# API tokens (users.authentication.APITokenAuthentication): validated tokens kept per process,
+# how many and for how long, and how often a process checks the shared cache for revocations (seconds)
+API_TOKEN_CACHE_SIZE = 1024
+API_TOKEN_CACHE_TIMEOUT = 5 * 60
+API_TOKEN_REVOCATION_CHECK_INTERVAL = 1
+
+# Seconds a serialized project / task list stays cached, entries of older organization versions just age out
+LIST_RESPONSE_CACHE_TIMEOUT = 10 * 60
+
+# Full-text search over task titles / descriptions (core.search), swap for another BaseTaskSearchBackend off SQLite
+TASK_SEARCH_BACKEND = 'core.search.SQLiteFTS5Backend'
+
+# How model history rows are written (common.history): 'immediate' - one INSERT per save (plain simple_history),
+# 'on_commit' - buffered per transaction, bulk inserted after commit, 'celery' - bulk inserted by a worker
+HISTORY_WRITE_MODE = os.environ.get('HISTORY_WRITE_MODE', 'on_commit')
+
+# Chunked task attachment uploads (core.uploads), total size and per request chunk limits in bytes
+ATTACHMENT_MAX_SIZE = 2 * 1024 ** 3
+ATTACHMENT_CHUNK_MAX_SIZE = 8 * 1024 ** 2
+
+# Who sends attachment downloads (core.downloads): '' - Django itself (FileResponse, Range support),
+# 'x-accel-redirect' - nginx, from an `internal` location mapped to MEDIA_ROOT under ATTACHMENT_ACCEL_REDIRECT_PREFIX,
+# 'x-sendfile' - Apache mod_xsendfile / lighttpd
+ATTACHMENT_DOWNLOAD_BACKEND = os.environ.get('ATTACHMENT_DOWNLOAD_BACKEND', '')
+ATTACHMENT_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Task change events the notification outbox relay (notifications.outbox) fans out per transaction
+NOTIFICATION_OUTBOX_BATCH_SIZE = 500
+
 # Celery Configuration
 # CELERY_BROKER_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 # CELERY_RESULT_BACKEND = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
@@ -116,6 +166,12 @@ CHANNEL_LAYERS = {
 # CELERY_TASK_SERIALIZER = 'json'
 # CELERY_RESULT_SERIALIZER = 'json'
 # CELERY_TIMEZONE = 'UTC'
+# Tasks always go to the broker, a missing CELERY_BROKER_URL fails loudly instead of running the notification
+# fan-out (notifications.outbox) inline on the request path. CELERY_TASK_ALWAYS_EAGER=1 runs them inline on
+# purpose (development without a worker), tests enable it with override_settings.
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', '') == '1'
+CELERY_TASK_EAGER_PROPAGATES = True
 #
 # # Email settings for notifications
 # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification, NotificationPreference, WebSocketConnection
+from .models import Notification, NotificationOutbox, NotificationPreference, WebSocketConnection
 
 
 @admin.register(Notification)
@@ -22,6 +22,13 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email']
 
 
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'task', 'notification_type', 'sender', 'created_at']
+    list_filter = ['notification_type', 'created_at']
+    readonly_fields = ['event_id', 'created_at']
+
+
 @admin.register(WebSocketConnection)
 class WebSocketConnectionAdmin(admin.ModelAdmin):
     list_display = ['user', 'organization', 'project', 'connected_at', 'last_seen']
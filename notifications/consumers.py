@@ -4,8 +4,10 @@ from channels.db import database_sync_to_async
 from django.contrib.auth.models import User
 from django.template.loader import get_template, render_to_string
 
+from common.resolvers import get_cached_organization_ids
 from core.models import Organization, Projects
 from .models import WebSocketConnection, NotificationPreference
+from .services import NOTIFICATION_TEMPLATE, preference_data, user_group_name
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -31,6 +33,21 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
+        # Notifications are addressed to the recipient's own group, not broadcast to the organization
+        self.user_group_name = user_group_name(self.user.id, self.organization_id)
+        await self.channel_layer.group_add(
+            self.user_group_name,
+            self.channel_name
+        )
+
+        # Preferences live in the connection, kept current by preferences_changed messages
+        self.preferences = await self.load_preferences()
+        self.control_group_name = user_group_name(self.user.id)
+        await self.channel_layer.group_add(
+            self.control_group_name,
+            self.channel_name
+        )
+
         # Join project group if specified
         if self.project_id:
             has_project_access = await self.check_project_access()
@@ -52,6 +69,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.organization_group_name,
             self.channel_name
         )
+        await self.channel_layer.group_discard(
+            self.user_group_name,
+            self.channel_name
+        )
+        await self.channel_layer.group_discard(
+            self.control_group_name,
+            self.channel_name
+        )
 
         if hasattr(self, 'project_group_name'):
             await self.channel_layer.group_discard(
@@ -77,18 +102,19 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.leave_project_room(project_id)
 
     async def notification_message(self, event):
-        """Handle notification messages sent to the group"""
-        notification_data = event['notification_data']
-
+        """Handle notification messages sent to the user's group, always addressed to this user"""
         # Check if user should receive this notification
-        should_receive = await self.should_receive_notification(notification_data)
-        if should_receive:
-
-            html = get_template("partials/notification.html").render(
-                context={"data": notification_data}
+        if self.should_receive_notification():
+            # rendered once by the producer, older messages without it are rendered here
+            html = event.get('html') or get_template(NOTIFICATION_TEMPLATE).render(
+                context={"data": event['notification_data']}
             )
             await self.send(text_data=html)
 
+    async def preferences_changed(self, event):
+        """Preferences saved through NotificationPreferenceView"""
+        self.preferences = event['preferences']
+
     async def issue_update(self, event):
         """Handle issue update messages"""
         issue_data = event['issue_data']
@@ -99,19 +125,15 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def check_organization_access(self):
-        try:
-            org = Organization.objects.get(id=self.organization_id)
-            return org.users.filter(id=self.user.id).exists()
-        except Organization.DoesNotExist:
-            return False
+        # cached membership, only hits the DB on a cache miss
+        return int(self.organization_id) in get_cached_organization_ids(self.user)
 
     @database_sync_to_async
     def check_project_access(self):
-        try:
-            project = Projects.objects.get(id=self.project_id)
-            return  project.organization.users.filter(id=self.user.id).exists()
-        except Projects.DoesNotExist:
-            return False
+        return Projects.objects.filter(
+            id=self.project_id,
+            organization_id__in=get_cached_organization_ids(self.user)
+        ).exists()
 
     @database_sync_to_async
     def store_connection(self):
@@ -147,12 +169,11 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         ).update(is_read=True, read_at=timezone.now())
 
     @database_sync_to_async
-    def should_receive_notification(self, notification_data):
-        try:
-            prefs = NotificationPreference.objects.get(user=self.user)
-            return prefs.websocket_enabled and prefs.issue_updates
-        except NotificationPreference.DoesNotExist:
-            return True
+    def load_preferences(self):
+        return preference_data(NotificationPreference.objects.filter(user=self.user).first())
+
+    def should_receive_notification(self):
+        return self.preferences['websocket_enabled'] and self.preferences['issue_updates']
 
     async def join_project_room(self, project_id):
         if await self.check_specific_project_access(project_id):
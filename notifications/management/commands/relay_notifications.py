@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import notification_outbox
+
+
+class Command(BaseCommand):
+    help = "Fan out the pending task change events of the notification outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Events per transaction, defaults to NOTIFICATION_OUTBOX_BATCH_SIZE")
+
+    def handle(self, *args, **options):
+        relayed = notification_outbox.relay(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Relayed {relayed} notification events"))
@@ -39,18 +39,40 @@ class Notification(BaseModels):
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
 
+    # `<outbox event id>:<recipient id>` for rows written by the outbox relay, a replayed event inserts nothing
+    dedup_key = models.CharField(max_length=80, unique=True, null=True, blank=True, editable=False)
+
+    # written once, then only marked read - history would just double every insert
+    track_history = False
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', 'is_read']),
             models.Index(fields=['organization', 'project']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['recipient', '-created_at', '-id']),  # keyset pagination
         ]
 
     def __str__(self):
         return f"{self.title} - {self.recipient.email}"
 
 
+class NotificationOutbox(models.Model):
+    """
+    Task change waiting to be fanned out, written in the transaction of the change itself.
+    Drained in batches by notifications.outbox.NotificationOutboxRelay, rows are deleted once delivered.
+    """
+    event_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    task = models.ForeignKey(Tasks, on_delete=models.CASCADE, related_name='+')
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.notification_type} - task {self.task_id}"
+
+
 class WebSocketConnection(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     channel_name = models.CharField(max_length=255)
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import transaction
+
+from .models import Notification, NotificationOutbox
+from .services import notification_service
+
+
+class NotificationOutboxRelay:
+    """
+    Turns NotificationOutbox events into notifications, a batch at a time: the notifications of a whole batch
+    are built with one member / preference lookup and inserted with one bulk_create, then published to the
+    channel layer and the events deleted - all before the batch transaction commits.
+    At least once: a relay dying half way leaves the events in place and the next run replays them,
+    the dedup_key of every row makes the replay insert nothing twice (sockets may see a message twice).
+    """
+
+    def enqueue(self, task, notification_types, sender=None):
+        """Record events for `task`, call it inside the transaction changing the task"""
+        return self.enqueue_events([(task, notification_type) for notification_type in notification_types], sender=sender)
+
+    def enqueue_events(self, events, sender=None):
+        """Record many (task, notification_type) events with one insert, inside the transaction of the changes"""
+        return NotificationOutbox.objects.bulk_create([
+            NotificationOutbox(task=task, notification_type=notification_type, sender=sender)
+            for task, notification_type in events
+        ])
+
+    def relay(self, batch_size=None, max_batches=None):
+        """Drain the outbox, returns the number of events relayed"""
+        batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+        relayed = batches = 0
+        while max_batches is None or batches < max_batches:
+            count = self.relay_batch(batch_size)
+            relayed += count
+            batches += 1
+            if count < batch_size:
+                break
+        return relayed
+
+    def relay_batch(self, batch_size):
+        with transaction.atomic():
+            # concurrent relays take disjoint batches (where the database can lock rows)
+            events = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('task__project__organization', 'sender')
+                .order_by('id')[:batch_size]
+            )
+            if not events:
+                return 0
+
+            notifications = notification_service.build_task_notifications(
+                (event.task, event.notification_type, event.sender, event.event_id) for event in events
+            )
+            Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+
+            # rows of a replayed event were inserted by the earlier run, publish them under their stored ids
+            stored_ids = dict(Notification.objects.filter(
+                task_id__in={event.task_id for event in events},
+                created_at__gte=min(event.created_at for event in events),
+                dedup_key__isnull=False,
+            ).order_by().values_list('dedup_key', 'id'))
+            for notification in notifications:
+                notification.id = stored_ids.get(notification.dedup_key, notification.id)
+
+            notification_service._send_websocket_notifications(notifications)
+            NotificationOutbox.objects.filter(pk__in=[event.pk for event in events]).delete()
+        return len(events)
+
+
+# Global instance
+notification_outbox = NotificationOutboxRelay()
@@ -1,49 +1,98 @@
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.template.loader import get_template
+from core.models import Organization
 from .models import Notification, NotificationPreference
 from django.utils import timezone
 
+NOTIFICATION_TEMPLATE = 'partials/notification.html'
+
+
+def user_group_name(user_id, organization_id=None):
+    """
+    Channel group of a user's notification sockets for one organization,
+    without an organization the group of all the user's sockets (control messages)
+    """
+    if organization_id is None:
+        return f'user_{user_id}'
+    return f'user_{user_id}_org_{organization_id}'
+
+
+def preference_data(preferences):
+    """What a socket needs of NotificationPreference, None (no row) means the defaults"""
+    if preferences is None:
+        return {'websocket_enabled': True, 'issue_updates': True}
+    return {'websocket_enabled': preferences.websocket_enabled, 'issue_updates': preferences.issue_updates}
+
 
 class NotificationService:
-    def __init__(self):
-        self.channel_layer = get_channel_layer()
+    @property
+    def channel_layer(self):
+        # resolved lazily so a CHANNEL_LAYERS override (tests) is picked up
+        return get_channel_layer()
 
     def create_task_notification(self, task, notification_type, sender=None, message=None):
-        """Create notification for task events"""
+        """Create notification for task events, fanned out to the organization members in a fixed number of queries"""
+        return self.create_bulk_task_notifications([(task, notification_type)], sender=sender, message=message)
+
+    def create_bulk_task_notifications(self, events, sender=None, message=None):
+        """
+        Create notifications for many (task, notification_type) events at once.
+        Members and muted preferences are loaded in one query each and the
+        notifications are written with a single bulk_create. `message` replaces the default text.
+        """
+        notifications = self.build_task_notifications(
+            [(task, notification_type, sender, None) for task, notification_type in events], message=message
+        )
+        Notification.objects.bulk_create(notifications)
+        self._send_websocket_notifications(notifications)
+
+        return notifications
 
-        # Get all project members
-        project_members = task.project.organization.users.all()
+    def build_task_notifications(self, events, message=None):
+        """
+        Unsaved notifications for (task, notification_type, sender, dedup_prefix) events, one per organization
+        member - members and muted preferences are loaded in one query each.
+        With a dedup_prefix every row gets the dedup_key `<prefix>:<recipient id>`.
+        """
+        events = list(events)
+        if not events:
+            return []
+
+        members = {}
+        organization_ids = {task.project.organization_id for task, *_ in events}
+        for organization_id, user_id in Organization.users.through.objects.filter(
+            organization_id__in=organization_ids
+        ).values_list('organization_id', 'baseuser_id'):
+            members.setdefault(organization_id, []).append(user_id)
+
+        muted = set(NotificationPreference.objects.filter(
+            user_id__in={user_id for user_ids in members.values() for user_id in user_ids},
+            issue_updates=False
+        ).values_list('user_id', flat=True))
 
-        # Create notifications for each member
         notifications = []
-        for member in project_members:
-            # Skip sender to avoid self-notification
-            if sender and member == sender:
-                continue
-
-            # Check user preferences
-            try:
-                prefs = NotificationPreference.objects.get(user=member)
-                if not prefs.task_updates:
+        for task, notification_type, sender, dedup_prefix in events:
+            title = self._get_notification_title(notification_type, task)
+            text = message or self._get_notification_message(notification_type, task, sender)
+            for user_id in members.get(task.project.organization_id, []):
+                # Skip sender to avoid self-notification, and users who muted updates
+                if (sender and user_id == sender.pk) or user_id in muted:
                     continue
-            except NotificationPreference.DoesNotExist:
-                pass  # Default to sending notifications
-
-            notification = Notification.objects.create(
-                recipient=member,
-                sender=sender,
-                organization=task.project.organization,
-                project=task.project,
-                task=task,
-                notification_type=notification_type,
-                title=self._get_notification_title(notification_type, task),
-                message=message or self._get_notification_message(notification_type, task, sender)
-            )
-            notifications.append(notification)
-
-        # Send WebSocket notifications
-        self._send_websocket_notifications(notifications)
-
+                notifications.append(Notification(
+                    recipient_id=user_id,
+                    sender=sender,
+                    organization=task.project.organization,
+                    project=task.project,
+                    task=task,
+                    notification_type=notification_type,
+                    title=title,
+                    message=text,
+                    dedup_key=f'{dedup_prefix}:{user_id}' if dedup_prefix else None,
+                    created_by=sender,
+                    updated_by=sender,
+                ))
         return notifications
 
     def send_overdue_reminder(self, task):
@@ -96,12 +145,15 @@ class NotificationService:
         return messages.get(notification_type, f'Issue notification from {sender_name}')
 
     def _send_websocket_notifications(self, notifications):
-        """Send notifications via WebSocket"""
+        """
+        Send notifications via WebSocket, each one only to its recipient's sockets of that organization -
+        one channel layer message per recipient, all sent in a single hop onto the event loop.
+        The HTML fragment is rendered here, once per distinct content, consumers forward it as is.
+        """
+        template = get_template(NOTIFICATION_TEMPLATE)
+        rendered = {}
+        messages = []
         for notification in notifications:
-            # Send to organization group
-            org_group = f'org_{notification.organization.id}'
-            project_group = f'project_{notification.project.id}'
-
             notification_data = {
                 'id': str(notification.id),
                 'type': notification.notification_type,
@@ -117,15 +169,32 @@ class NotificationService:
                     'full_name': notification.sender.get_full_name()
                 } if notification.sender else None
             }
-
-            # Send to project group
-            async_to_sync(self.channel_layer.group_send)(
-                org_group,
+            # the fragment shows no recipient specific data, every recipient of an event shares it
+            content = (notification_data['task_id'], notification_data['type'], notification_data['title'], notification_data['message'])
+            if content not in rendered:
+                rendered[content] = template.render(context={"data": notification_data})
+            messages.append((
+                user_group_name(notification.recipient_id, notification.organization.id),
                 {
                     'type': 'notification_message',
-                    'notification_data': notification_data
+                    'notification_data': notification_data,
+                    'html': rendered[content],
                 }
-            )
+            ))
+
+        if messages:
+            async_to_sync(self._group_send_all)(messages)
+
+    def send_preferences_changed(self, preferences):
+        """Push saved preferences to all of the user's open sockets once the transaction commits"""
+        message = {'type': 'preferences_changed', 'preferences': preference_data(preferences)}
+        group = user_group_name(preferences.user_id)
+        transaction.on_commit(lambda: async_to_sync(self.channel_layer.group_send)(group, message))
+
+    async def _group_send_all(self, messages):
+        channel_layer = self.channel_layer
+        for group, message in messages:
+            await channel_layer.group_send(group, message)
 
     def get_user_notifications(self, user, organization_id=None, project_id=None, unread_only=False):
         """Get notifications for a user"""
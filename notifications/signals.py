@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, pre_save
 from django.dispatch import receiver
 
 from core.models import Tasks
-from .services import notification_service
+from .outbox import notification_outbox
+from .tasks import relay_notification_outbox
 
 
 # @receiver(post_save, sender=User)
@@ -24,48 +26,62 @@ from .services import notification_service
 
 
 @receiver(pre_save, sender=Tasks)
-def track_task_changes(sender, instance, **kwargs):
-    """Track changes to task for notifications"""
-    if instance.pk:
-        try:
-            old_instance = Tasks.objects.filter(pk=instance.pk)
-            instance._old_assigned_to = old_instance.prefetch_related('assignees').values('assignees__email')
-            instance._old_status = old_instance.values('status')
-        except Tasks.DoesNotExist:
-            pass
+def track_task_changes(sender, instance, update_fields=None, **kwargs):
+    """Track changes to task for notifications - the stored status, saves not writing it skip the query"""
+    if instance.pk and (update_fields is None or 'status' in update_fields):
+        instance._old_status = Tasks.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
 
 
 @receiver(post_save, sender=Tasks)
 def handle_task_updated(sender, instance, created, **kwargs):
-    """Handle task update notifications"""
-    if not created:
-        # Check if assigned user changed
-        old_assigned_to = getattr(instance, '_old_assigned_to', None)
-        if old_assigned_to != instance.assignees:
-            notification_service.create_task_notification(
-                task=instance,
-                notification_type='task_assigned',
-                sender=getattr(instance, '_updated_by', None)
-            )
-
-        # Check if status changed to completed
-        old_status = getattr(instance, '_old_status', None)
-        if old_status != instance.status and instance.status == 'DONE':
-            notification_service.create_task_notification(
-                task=instance,
-                notification_type='task_completed',
-                sender=getattr(instance, '_updated_by', None)
-            )
-        elif old_status != instance.status:  # Status update, changes on task work flow
-            notification_service.create_task_notification(
-                task=instance,
-                notification_type='task_status_updated',
-                sender=getattr(instance, '_updated_by', None)
-            )
-        # else:                                               # General update, changes on task work flow
-        #     notification_service.create_task_notification(
-        #         task=instance,
-        #         notification_type='task_updated',
-        #         sender=getattr(instance, '_updated_by', None)
-        #     )
+    """
+    Handle task update notifications.
+    Only the events are recorded here, in the outbox and the transaction of the change - the relay fans them out
+    in a celery task queued once it commits. A save costs the same whatever the size of the organization.
+    Assignee changes never go through save(), they are picked up by handle_task_assignees_changed.
+    """
+    old_status = instance.__dict__.pop('_old_status', None)
+    if created or old_status is None:
+        return
 
+    notification_type = status_notification_type(old_status, instance.status)
+    if notification_type:
+        enqueue_task_notifications(instance, [notification_type])
+    # else:                                               # General update, changes on task work flow
+    #     notification_service.create_task_notification(
+    #         task=instance,
+    #         notification_type='task_updated',
+    #         sender=getattr(instance, '_updated_by', None)
+    #     )
+
+
+def status_notification_type(old_status, status):
+    """Notification type of a status change, None when the status did not change - shared with the bulk writes"""
+    if old_status == status:
+        return None
+    # Check if status changed to completed
+    if status == 'DONE':
+        return 'task_completed'
+    return 'task_status_updated'  # Status update, changes on task work flow
+
+
+@receiver(m2m_changed, sender=Tasks.assignees.through)
+def handle_task_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Assignees added / removed, from either side of the relation"""
+    if action == 'pre_clear' and not reverse:
+        # pk_set is not provided for clear(), remember whether there is anything to clear
+        instance._had_assignees = instance.assignees.exists()
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        if pk_set or (action == 'post_clear' and instance.__dict__.pop('_had_assignees', False)):
+            enqueue_task_notifications(instance, ['task_assigned'])
+    elif pk_set:  # user.tasks.add / remove(...)
+        for task in Tasks.objects.filter(pk__in=pk_set):
+            enqueue_task_notifications(task, ['task_assigned'])
+
+
+def enqueue_task_notifications(task, notification_types):
+    notification_outbox.enqueue(task, notification_types, sender=getattr(task, '_updated_by', None))
+    transaction.on_commit(relay_notification_outbox.delay)
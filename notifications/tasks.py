@@ -4,6 +4,15 @@ from datetime import timedelta
 from core.models import Tasks
 from .services import notification_service
 
+@shared_task
+def relay_notification_outbox(batch_size=None):
+    """Fan out pending task change events, queued after every commit that records some and on a schedule"""
+    from .outbox import notification_outbox
+
+    relayed = notification_outbox.relay(batch_size=batch_size)
+    return f"Relayed {relayed} notification events"
+
+
 @shared_task
 def send_overdue_reminders():
     """Send reminders for overdue issues"""
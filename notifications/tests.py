@@ -1,3 +1,214 @@
-from django.test import TestCase
+import base64
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Organization, Projects, Tasks
+from users.models import BaseUser, UserTypeChoices
+from .consumers import NotificationConsumer
+from .models import Notification, NotificationOutbox, NotificationPreference
+from .outbox import notification_outbox
+from .services import notification_service, user_group_name
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}, CELERY_TASK_ALWAYS_EAGER=True
+)
+class TaskNotificationFanOutTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            BaseUser.objects.create_user(
+                email=f'user{i}@example.com', first_name='Test', last_name=f'User {i}',
+                user_type=UserTypeChoices.MEMBER
+            )
+            for i in range(30)
+        ]
+        cls.organization = Organization.objects.create(name='Acme')
+        cls.project = Projects.objects.create(organization=cls.organization, name='Apollo')
+        cls.task = Tasks.objects.create(project=cls.project, title='Fan out')
+
+    def notify(self, members):
+        self.organization.users.set(members)
+        task = Tasks.objects.select_related('project__organization').get(pk=self.task.pk)
+        # members, muted preferences, one bulk insert
+        with self.assertNumQueries(3):
+            return notification_service.create_task_notification(task, 'task_completed', sender=self.users[0])
+
+    def test_query_count_does_not_grow_with_members(self):
+        self.assertEqual(len(self.notify(self.users[:3])), 2)
+        self.assertEqual(len(self.notify(self.users)), 29)
+        self.assertEqual(Notification.objects.filter(task=self.task).count(), 31)
+
+    def test_invalid_cursor_position_is_rejected(self):
+        self.client.force_login(self.users[1])
+        cursor = base64.b64encode(urlencode({'p': '2024-01-01T00:00:00|not-a-uuid'}).encode()).decode()
+        response = self.client.get(reverse('notifications:notification-list'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_sender_and_muted_members_are_skipped(self):
+        NotificationPreference.objects.create(user=self.users[1], issue_updates=False)
+        NotificationPreference.objects.create(user=self.users[2])
+
+        self.notify(self.users[:4])
+
+        self.assertEqual(
+            set(Notification.objects.filter(task=self.task).values_list('recipient_id', flat=True)),
+            {self.users[2].pk, self.users[3].pk}
+        )
+
+    def test_each_recipient_gets_one_message_on_its_own_group(self):
+        self.organization.users.set(self.users[:3])
+        channel_layer = get_channel_layer()
+        channels = {}
+        for user in self.users[:3]:
+            channels[user.pk] = async_to_sync(channel_layer.new_channel)()
+            async_to_sync(channel_layer.group_add)(user_group_name(user.pk, self.organization.pk), channels[user.pk])
+            async_to_sync(channel_layer.group_add)(f'org_{self.organization.pk}', channels[user.pk])
+
+        notifications = notification_service.create_task_notification(self.task, 'task_completed', sender=self.users[0])
+
+        # the sender's socket gets nothing, every recipient's socket exactly its own notification
+        self.assertNotIn(channels[self.users[0].pk], channel_layer.channels)
+        for notification in notifications:
+            queue = channel_layer.channels[channels[notification.recipient_id]]
+            self.assertEqual(queue.qsize(), 1)
+            _, message = queue.get_nowait()
+            self.assertEqual(message['notification_data']['id'], str(notification.id))
+            self.assertIn('Fan out', message['html'])
+
+    def test_fragment_is_rendered_once_per_event(self):
+        self.organization.users.set(self.users)
+        with mock.patch('django.template.backends.django.Template.render', return_value='<div/>') as render:
+            notification_service.create_task_notification(self.task, 'task_completed', sender=self.users[0])
+        self.assertEqual(render.call_count, 1)
+
+    def test_task_save_records_outbox_events_relayed_after_commit(self):
+        self.organization.users.set(self.users)
+        self.task._updated_by = self.users[0]
+        self.task.status = 'DONE'
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.save()
+        self.assertEqual(
+            list(NotificationOutbox.objects.filter(task=self.task).values_list('notification_type', flat=True)),
+            ['task_completed']
+        )
+        self.assertFalse(Notification.objects.filter(task=self.task).exists())
+
+        for callback in callbacks:
+            callback()  # celery runs eagerly without a broker
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertEqual(Notification.objects.filter(task=self.task).count(), 29)
+        self.assertFalse(Notification.objects.filter(task=self.task, recipient=self.users[0]).exists())
+
+    def test_saves_without_changes_enqueue_nothing(self):
+        self.task.save(update_fields=['updated_at'])
+        self.task.title = 'Renamed'
+        self.task.save()
+        self.task.assignees.add(self.users[1])
+        self.task.assignees.add(self.users[1])
+        self.task.assignees.clear()
+        self.task.assignees.clear()
+
+        self.assertEqual(
+            list(NotificationOutbox.objects.values_list('notification_type', flat=True)), ['task_assigned'] * 2
+        )
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class NotificationOutboxRelayTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            BaseUser.objects.create_user(
+                email=f'user{i}@example.com', first_name='Test', last_name=f'User {i}',
+                user_type=UserTypeChoices.MEMBER
+            )
+            for i in range(10)
+        ]
+        cls.organization = Organization.objects.create(name='Acme')
+        cls.organization.users.set(cls.users)
+        cls.project = Projects.objects.create(organization=cls.organization, name='Apollo')
+        cls.tasks = [Tasks.objects.create(project=cls.project, title=f'Task {i}') for i in range(6)]
+
+    def test_batch_costs_a_fixed_number_of_queries(self):
+        for task in self.tasks:
+            notification_outbox.enqueue(task, ['task_assigned'], sender=self.users[0])
+
+        # per batch: savepoint, events, members, preferences, insert, stored ids, delete, release
+        with self.assertNumQueries(16):
+            self.assertEqual(notification_outbox.relay(batch_size=4), 6)
+
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertEqual(Notification.objects.count(), 6 * 9)
+
+    def test_replayed_event_inserts_nothing_twice(self):
+        event, = notification_outbox.enqueue(self.tasks[0], ['task_completed'])
+        notification_outbox.relay()
+        stored = dict(Notification.objects.values_list('dedup_key', 'id'))
+
+        # the relay died after inserting, before the event was deleted
+        replayed = NotificationOutbox.objects.create(event_id=event.event_id, task=self.tasks[0], notification_type='task_completed')
+        NotificationOutbox.objects.filter(pk=replayed.pk).update(created_at=event.created_at)
+        with mock.patch.object(notification_service, '_send_websocket_notifications') as send:
+            call_command('relay_notifications', stdout=StringIO())
+
+        self.assertEqual(dict(Notification.objects.values_list('dedup_key', 'id')), stored)
+        self.assertEqual({str(n.id) for n in send.call_args.args[0]}, {str(pk) for pk in stored.values()})
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class NotificationConsumerPreferenceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = BaseUser.objects.create_user(
+            email='socket@example.com', first_name='Test', last_name='Socket',
+            user_type=UserTypeChoices.MEMBER, password='secret-pass-123'
+        )
+
+    def consumer(self, **preferences):
+        consumer = NotificationConsumer()
+        consumer.preferences = {'websocket_enabled': True, 'issue_updates': True, **preferences}
+        consumer.send = mock.AsyncMock()
+        return consumer
+
+    def test_prerendered_fragment_is_sent_without_queries(self):
+        consumer = self.consumer()
+        with self.assertNumQueries(0):
+            async_to_sync(consumer.notification_message)({'notification_data': {}, 'html': '<div>hi</div>'})
+        consumer.send.assert_awaited_once_with(text_data='<div>hi</div>')
+
+    def test_muted_socket_drops_notifications(self):
+        consumer = self.consumer(websocket_enabled=False)
+        async_to_sync(consumer.notification_message)({'notification_data': {}, 'html': '<div>hi</div>'})
+        consumer.send.assert_not_awaited()
+
+        async_to_sync(consumer.preferences_changed)({'preferences': {'websocket_enabled': True, 'issue_updates': True}})
+        async_to_sync(consumer.notification_message)({'notification_data': {}, 'html': '<div>hi</div>'})
+        consumer.send.assert_awaited_once()
+
+    def test_saving_preferences_notifies_open_sockets(self):
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(user_group_name(self.user.pk), channel)
+        self.client.force_login(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('notifications:notification-preferences'), {'websocket_enabled': False}, content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        _, message = channel_layer.channels[channel].get_nowait()
+        self.assertEqual(message, {
+            'type': 'preferences_changed', 'preferences': {'websocket_enabled': False, 'issue_updates': True}
+        })
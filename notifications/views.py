@@ -1,5 +1,4 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.sessions.models import Session
 from django.db.models import Q
 from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render
@@ -10,46 +9,23 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from common.pagination import LimitOffsetOrCursorPagination
+from common.resolvers import get_user_organization_ids
 from core.models import Organization
-from users.models import BaseUser
 from .models import Notification, NotificationPreference
 from .serializers import NotificationSerializer, NotificationPreferenceSerializer
 from .services import notification_service
 
 class HomeView(LoginRequiredMixin, View):
-    def get_query_set_from_user_session(self):
-        """
-        Retrieve the user from the session using the session ID.
-        """
-        sessionid = self.request.COOKIES.get('sessionid')
-
-        if sessionid:
-            try:
-                session = Session.objects.get(session_key=sessionid)
-                session_data = session.get_decoded()
-                user_id = session_data.get('_auth_user_id')
-
-                if BaseUser.objects.filter(id=user_id).exists():
-                    return user_id
-                    # return Organization.objects.filter(users__id=user_id)
-            except Session.DoesNotExist:
-                pass  # Session does not exist
-        return None  # Return None if no user is found
-
     def get(self, request, *args, **kwargs):
-        # Fetch user ID from session
-        user_id = self.get_query_set_from_user_session()
-
-        if not user_id:
-            return JsonResponse({'error': 'User session not found'}, status=400)
+        # Organizations visible to the user, resolved once for the request
+        organization_ids = get_user_organization_ids(request)
 
         # Fetch organizations related to the user with projects
-        organizations = Organization.objects.prefetch_related('projects') \
-                .filter(
-                Q(users__id=user_id) &
-                Q(id__isnull=False) &
-                Q(projects__id__isnull=False)
-            ).distinct()
+        organizations = Organization.objects.filter(
+            Q(id__in=organization_ids) &
+            Q(projects__id__isnull=False)
+        ).distinct()
 
         # Prepare context
         context = {
@@ -63,6 +39,7 @@ class HomeView(LoginRequiredMixin, View):
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = LimitOffsetOrCursorPagination  # ?cursor= switches to keyset pagination on (created_at, id)
 
     def get_queryset(self):
         user = self.request.user
@@ -97,6 +74,11 @@ class NotificationPreferenceView(generics.RetrieveUpdateAPIView):
         obj, created = NotificationPreference.objects.get_or_create(user=self.request.user)
         return obj
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # open sockets keep the preferences in memory, refresh them
+        notification_service.send_preferences_changed(serializer.instance)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
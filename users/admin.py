@@ -1,4 +1,5 @@
 from django.contrib import admin
-from . models import BaseUser
+from . models import APIToken, BaseUser
 
-admin.site.register(BaseUser)
\ No newline at end of file
+admin.site.register(BaseUser)
+admin.site.register(APIToken)
\ No newline at end of file
@@ -1,7 +1,147 @@
 # Create your views here.
-from rest_framework.authentication import SessionAuthentication
+import copy
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, BasicAuthentication, SessionAuthentication, get_authorization_header
+
+from common.lru import LRUCache
+from .models import APIToken
+
+BASIC_AUTH_CACHE_KEY = 'basic_auth_{digest}'
+API_TOKEN_REVOCATIONS_KEY = 'api_token_revocations'
 
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     def enforce_csrf(self, request):
-        return  # To not perform the csrf check previously happening
\ No newline at end of file
+        return  # To not perform the csrf check previously happening
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    BasicAuthentication that remembers successful verifications for BASIC_AUTH_CACHE_TIMEOUT seconds,
+    so scripted clients don't pay a full Argon2 verify on every request.
+    Entries are keyed by an HMAC of the credentials (nothing reversible is stored) and hold the user's
+    session auth hash - itself an HMAC of the password hash - so a password change voids them at once.
+    Failed attempts are never cached, guessing still costs a full verify.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = BASIC_AUTH_CACHE_KEY.format(
+            digest=salted_hmac('users.CachedBasicAuthentication', f'{userid}\0{password}', algorithm='sha256').hexdigest()
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            user_id, auth_hash = cached
+            user = get_user_model()._default_manager.filter(pk=user_id).first()
+            if user is not None and constant_time_compare(user.get_session_auth_hash(), auth_hash):
+                if not user.is_active:
+                    raise exceptions.AuthenticationFailed('User inactive or deleted.')
+                return (user, None)
+            cache.delete(key)
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        cache.set(key, (user.pk, user.get_session_auth_hash()), settings.BASIC_AUTH_CACHE_TIMEOUT)
+        return (user, auth)
+
+
+class APITokenCache:
+    """
+    Per process LRU of validated tokens: key hash -> (user, token), so a hit costs no query.
+    Revocations are broadcast through a counter in the shared cache, every process compares it with the
+    value it last saw at most once per API_TOKEN_REVOCATION_CHECK_INTERVAL seconds and drops all its
+    entries when it moved - a revoked token stops working everywhere within that interval.
+    """
+
+    def __init__(self):
+        self._entries = None
+        self._generation = None
+        self._checked_at = None
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = LRUCache(settings.API_TOKEN_CACHE_SIZE, settings.API_TOKEN_CACHE_TIMEOUT)
+        return self._entries
+
+    def get(self, key_hash):
+        self.sync()
+        return self.entries.get(key_hash)
+
+    def set(self, key_hash, value, generation):
+        # a revocation seen while the token was loaded wins, the entry is left out
+        if generation == self._generation:
+            self.entries.set(key_hash, value)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def sync(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < settings.API_TOKEN_REVOCATION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        generation = cache.get(API_TOKEN_REVOCATIONS_KEY)
+        if generation != self._generation:
+            self.entries.clear()
+            self._generation = generation
+
+    def broadcast_revocation(self):
+        self.entries.clear()
+        cache.add(API_TOKEN_REVOCATIONS_KEY, 0, None)
+        try:
+            cache.incr(API_TOKEN_REVOCATIONS_KEY)
+        except ValueError:  # evicted in between
+            cache.set(API_TOKEN_REVOCATIONS_KEY, 1, None)
+        self._checked_at = None
+
+
+# Global instance
+api_token_cache = APITokenCache()
+
+
+class APITokenAuthentication(BaseAuthentication):
+    """
+    `Authorization: Token <key>` (or `Bearer <key>`) against APIToken.
+    Validated tokens are served from api_token_cache, a miss is one query and stamps last_used_at.
+    """
+    keywords = (b'token', b'bearer')
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() not in self.keywords:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        return self.authenticate_credentials(key)
+
+    def authenticate_credentials(self, key):
+        key_hash = APIToken.hash_key(key)
+        cached = api_token_cache.get(key_hash)
+        if cached is None:
+            generation = api_token_cache.generation
+            token = APIToken.objects.select_related('user').filter(key_hash=key_hash, revoked_at__isnull=True).first()
+            if token is None or not token.user.is_active:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            APIToken.objects.filter(pk=token.pk).update(last_used_at=timezone.now())
+            cached = (token.user, token)
+            api_token_cache.set(key_hash, cached, generation)
+
+        user, token = cached
+        if token.expires_at is not None and token.expires_at <= timezone.now():
+            raise exceptions.AuthenticationFailed('Token expired.')
+        # cached objects are shared between requests, each one gets its own copy
+        return (copy.copy(user), copy.copy(token))
+
+    def authenticate_header(self, request):
+        return 'Token'
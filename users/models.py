@@ -1,5 +1,10 @@
+import hashlib
+import secrets
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin, Group, Permission
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 
@@ -77,11 +82,59 @@ class BaseUser(AbstractBaseUser, BaseModels, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name', 'user_type']
 
+    # logins only stamp last_login, not worth a history row each
+    history_ignored_update_fields = ('last_login',)
+
     objects = CustomUserManager()
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def get_full_name(self):
+        return f"{self.first_name} {self.last_name}".strip()
+
+
+
+class APITokenManager(models.Manager):
+    def create_token(self, user, name, expires_at=None):
+        """Create a token for `user`, returns (token, key) - the key is only ever available here"""
+        prefix = secrets.token_hex(4)
+        key = f"{prefix}.{secrets.token_urlsafe(32)}"
+        token = self.create(user=user, name=name, prefix=prefix, key_hash=APIToken.hash_key(key), expires_at=expires_at)
+        return token, key
+
+
+class APIToken(models.Model):
+    """
+    Credential for machine clients, sent as `Authorization: Token <key>`.
+    Only a SHA-256 of the key is stored - keys are 256 random bits, a slow password hash buys nothing -
+    the prefix is kept in clear so owners can tell their tokens apart.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='api_tokens')
+    name = models.CharField(max_length=255)
+    prefix = models.CharField(max_length=8, db_index=True)
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    objects = APITokenManager()
+
+    def __str__(self):
+        return f"{self.name} ({self.prefix}…)"
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @property
+    def is_valid(self):
+        return self.revoked_at is None and (self.expires_at is None or self.expires_at > timezone.now())
+
+    def revoke(self):
+        self.revoked_at = timezone.now()
+        self.save(update_fields=['revoked_at'])
 
 # class PasswordReset(models.Model):
 #     email = models.EmailField()
@@ -2,6 +2,7 @@ from django.db.models import Q
 from django.template.context_processors import request
 from rest_framework import permissions
 
+from common.resolvers import get_user_organization_ids
 from core.models import Tasks
 from . models import UserTypeChoices
 
@@ -33,8 +34,8 @@ class ManagerPrivileges(permissions.BasePermission):
             return True
 
         if UserTypeFlag.user_data_isolation(request.user.user_type):
-            # Check if user belongs to the same organization as the object's project
-            return request.user.belonging_organization.filter(id=obj.project.organization_id).exists()
+            # Check if user belongs to the same organization as the object's project (cached membership)
+            return obj.project.organization_id in get_user_organization_ids(request)
         return False
 
 class OwnerPrivileges(permissions.BasePermission):
@@ -59,8 +60,8 @@ class OwnerPrivileges(permissions.BasePermission):
             return True
 
         if UserTypeFlag.user_data_isolation(request.user.user_type):
-            # Check if user belongs to the same organization as the object's project
-            return request.user.belonging_organization.filter(id=obj.project.organization_id).exists()
+            # Check if user belongs to the same organization as the object's project (cached membership)
+            return obj.project.organization_id in get_user_organization_ids(request)
         return False
 
 class MemberPrivileges(permissions.BasePermission):
@@ -80,7 +81,9 @@ class MemberPrivileges(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        # Check if the user is a assigned member to this task
+        # Check if the user is a assigned member to this task (prefetched assignees spare the query)
+        if 'assignees' in getattr(obj, '_prefetched_objects_cache', {}):
+            return any(user.pk == request.user.id for user in obj.assignees.all())
         if obj.assignees.filter(id=request.user.id).exists():
             return True
 
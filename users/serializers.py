@@ -1,7 +1,7 @@
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 
-from .models import BaseUser, UserTypeChoices
+from .models import APIToken, BaseUser, UserTypeChoices
 
 
 class CreateUserSerializer(serializers.ModelSerializer):
@@ -42,4 +42,20 @@ class LoginUserSerializer(serializers.Serializer):
             raise serializers.ValidationError("Both 'username' and 'password' are required.")
 
         attrs['user'] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+class APITokenSerializer(serializers.ModelSerializer):
+    """
+    Token of the requesting user, `key` is only part of the response to its creation
+    """
+    key = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = APIToken
+        fields = ['id', 'name', 'prefix', 'key', 'created_at', 'expires_at', 'revoked_at', 'last_used_at']
+        read_only_fields = ['prefix', 'created_at', 'revoked_at', 'last_used_at']
+
+    def create(self, validated_data):
+        token, key = APIToken.objects.create_token(self.context['request'].user, **validated_data)
+        token.key = key
+        return token
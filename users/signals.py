@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import api_token_cache
+from .models import APIToken, BaseUser
+
+
+@receiver(post_save, sender=APIToken)
+@receiver(post_delete, sender=APIToken)
+def broadcast_token_change(sender, instance, created=False, **kwargs):
+    """Revoked / edited / deleted tokens leave every process's token cache"""
+    if not created:
+        api_token_cache.broadcast_revocation()
+
+
+@receiver(post_save, sender=BaseUser)
+def broadcast_token_user_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Cached tokens carry their user, deactivations and permission changes must not wait for the TTL.
+    Deleted users need nothing here - their tokens are deleted along with them.
+    """
+    if created or (update_fields and set(update_fields) <= set(instance.history_ignored_update_fields)):
+        return
+    if APIToken.objects.filter(user_id=instance.pk).exists():
+        api_token_cache.broadcast_revocation()
@@ -1,3 +1,132 @@
-from django.test import TestCase
+import base64
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .authentication import API_TOKEN_REVOCATIONS_KEY, api_token_cache
+from .models import APIToken, BaseUser, UserTypeChoices
+
+
+class CachedBasicAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = BaseUser.objects.create_user(
+            email='script@example.com', first_name='Api', last_name='Client',
+            user_type=UserTypeChoices.MANAGER, password='first-pass-123'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('list-project-stats')
+
+    def get(self, password):
+        credentials = base64.b64encode(f'{self.user.email}:{password}'.encode()).decode()
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+
+    def test_verified_credentials_skip_the_hasher(self):
+        with mock.patch('django.contrib.auth.base_user.check_password', wraps=hashers.check_password) as check:
+            for _ in range(3):
+                self.assertEqual(self.get('first-pass-123').status_code, 200)
+        self.assertEqual(check.call_count, 1)
+
+    def test_wrong_password_is_never_cached(self):
+        with mock.patch('django.contrib.auth.base_user.check_password', wraps=hashers.check_password) as check:
+            for _ in range(2):
+                self.assertEqual(self.get('wrong').status_code, 403)
+        self.assertEqual(check.call_count, 2)
+
+    def test_password_change_voids_cached_credentials(self):
+        self.assertEqual(self.get('first-pass-123').status_code, 200)
+
+        self.user.set_password('second-pass-456')
+        self.user.save()
+
+        self.assertEqual(self.get('first-pass-123').status_code, 403)
+        self.assertEqual(self.get('second-pass-456').status_code, 200)
+
+
+class APITokenAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = BaseUser.objects.create_user(
+            email='robot@example.com', first_name='Api', last_name='Robot',
+            user_type=UserTypeChoices.MANAGER, password='robot-pass-123'
+        )
+
+    def setUp(self):
+        cache.clear()
+        api_token_cache.entries.clear()
+        self.token, self.key = APIToken.objects.create_token(self.user, 'ci')
+        self.url = reverse('list-project-stats')
+
+    def get(self, url=None, key=None):
+        return self.client.get(url or self.url, HTTP_AUTHORIZATION=f'Token {key or self.key}')
+
+    def token_queries(self, url=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get(url).status_code, 200)
+        return [query['sql'] for query in queries if 'users_apitoken' in query['sql']]
+
+    def test_key_is_returned_once_and_stored_hashed(self):
+        credentials = base64.b64encode(b'robot@example.com:robot-pass-123').decode()
+        response = self.client.post(reverse('list-create-api-tokens'), {'name': 'deploy'}, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(response.status_code, 201)
+        key = response.data['key']
+        self.assertTrue(key.startswith(response.data['prefix']))
+        self.assertFalse(APIToken.objects.filter(key_hash=key).exists())
+
+        listed = self.get(reverse('list-create-api-tokens'), key=key).data
+        self.assertEqual({token['name'] for token in listed}, {'ci', 'deploy'})
+        self.assertTrue(all('key' not in token for token in listed))
+
+    def test_cached_token_costs_no_token_query(self):
+        self.assertEqual(len(self.token_queries()), 2)  # lookup + last_used_at
+        self.assertEqual(self.token_queries(), [])
+        self.assertIsNotNone(APIToken.objects.get(pk=self.token.pk).last_used_at)
+
+    def test_unknown_and_expired_tokens_are_rejected(self):
+        self.assertEqual(self.get(key='nope.nope').status_code, 403)
+
+        APIToken.objects.filter(pk=self.token.pk).update(expires_at=self.token.created_at)
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_revoked_token_stops_working_at_once(self):
+        self.assertEqual(self.get().status_code, 200)
+
+        response = self.client.delete(
+            reverse('revoke-api-token', args=[self.token.pk]), HTTP_AUTHORIZATION=f'Token {self.key}'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNotNone(APIToken.objects.get(pk=self.token.pk).revoked_at)
+        self.assertEqual(self.get().status_code, 403)
+
+    @override_settings(API_TOKEN_REVOCATION_CHECK_INTERVAL=0)
+    def test_revocation_broadcast_from_another_process(self):
+        self.assertEqual(self.get().status_code, 200)
+
+        # another worker revoked the token: the row changed and the shared counter moved,
+        # this process's cache still holds the token
+        APIToken.objects.filter(pk=self.token.pk).update(revoked_at=self.token.created_at)
+        self.assertEqual(self.get().status_code, 200)
+        cache.add(API_TOKEN_REVOCATIONS_KEY, 0, None)
+        cache.incr(API_TOKEN_REVOCATIONS_KEY)
+
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_deactivated_user_is_dropped_from_the_cache(self):
+        self.assertEqual(self.get().status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_notification_endpoints_accept_tokens(self):
+        self.assertEqual(self.get(reverse('notifications:notification-list')).status_code, 200)
@@ -1,8 +1,10 @@
 from django.urls import path
-from . views import CreateUsersView, LoginView, logout_view
+from . views import CreateUsersView, ListCreateAPITokens, LoginView, RevokeAPIToken, logout_view
 
 urlpatterns = [
     path('create_user/', CreateUsersView.as_view(), name='create-organization-user'),
     path('login/', LoginView.as_view(), name='user-login'),
     path('logout/', logout_view , name='logout'),
+    path('tokens/', ListCreateAPITokens.as_view(), name='list-create-api-tokens'),
+    path('tokens/<int:pk>/', RevokeAPIToken.as_view(), name='revoke-api-token'),
 ]
\ No newline at end of file
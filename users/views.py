@@ -3,24 +3,24 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import login as django_login, logout
 from rest_framework import permissions, status
-from rest_framework.generics import CreateAPIView
+from rest_framework.generics import CreateAPIView, DestroyAPIView, ListCreateAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.authentication import SessionAuthentication, BasicAuthentication
+from rest_framework.authentication import SessionAuthentication
 
-from .serializers import CreateUserSerializer, LoginUserSerializer
-from . models import BaseUser
-from . authentication import CsrfExemptSessionAuthentication
+from .serializers import APITokenSerializer, CreateUserSerializer, LoginUserSerializer
+from . models import APIToken, BaseUser
+from . authentication import APITokenAuthentication, CachedBasicAuthentication, CsrfExemptSessionAuthentication
 
 class CreateUsersView(CreateAPIView):
     queryset = BaseUser.objects.all()
     serializer_class = CreateUserSerializer
-    authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication, SessionAuthentication)
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
     permission_classes = [permissions.IsAuthenticated]
 
 @method_decorator(csrf_exempt, name='dispatch')
 class LoginView(APIView):
-    authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication, SessionAuthentication)
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
     permission_classes = (permissions.AllowAny,)
 
     def post(self, request):
@@ -43,6 +43,33 @@ class LoginView(APIView):
             'message': 'Login successful'
         }, status=status.HTTP_200_OK)
 
+class ListCreateAPITokens(ListCreateAPIView):
+    """
+    API tokens of the requesting user, the key of a new token is returned once and never again
+    """
+    serializer_class = APITokenSerializer
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return APIToken.objects.filter(user=self.request.user).order_by('-created_at')
+
+
+class RevokeAPIToken(DestroyAPIView):
+    """
+    Revoke one of the requesting user's tokens, the row is kept for auditing
+    """
+    authentication_classes = (CsrfExemptSessionAuthentication, CachedBasicAuthentication, APITokenAuthentication, SessionAuthentication)
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return APIToken.objects.filter(user=self.request.user, revoked_at__isnull=True)
+
+    def perform_destroy(self, instance):
+        instance.revoke()
+
+
 @csrf_exempt
 def logout_view(request):
     logout(request)